@@ -2,6 +2,7 @@ import numpy as np
 import time
 import pygame
 import sys
+from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Tuple, List, Optional
 from board import GomokuBoard
 from player import GomokuAI
@@ -19,6 +20,7 @@ class GomokuGame:
         """
         self.board = GomokuBoard(board_size)
         self.gui_enabled = gui_enabled
+        self.thinking = None  # Progress of the AI search running in the background
         
         # Initialize GUI if enabled
         if gui_enabled:
@@ -30,6 +32,8 @@ class GomokuGame:
             self.MARGIN = 50
             self.WIDTH = self.CELL_SIZE * board_size + 2 * self.MARGIN
             self.HEIGHT = self.CELL_SIZE * board_size + 2 * self.MARGIN
+            self.FPS = 30  # Frames drawn per second while the game runs
+            self.clock = pygame.time.Clock()
             
             # Colors - Updated to white background
             self.BLACK = (0, 0, 0)
@@ -137,7 +141,75 @@ class GomokuGame:
         text_surface = self.font.render(status_text, True, self.BLACK)
         self.screen.blit(text_surface, (10, 10))
         
+        if self.thinking:
+            self.draw_thinking()
+        
         pygame.display.flip()
+    
+    def draw_thinking(self):
+        """Draw the progress of the running AI search below the board."""
+        thinking = self.thinking
+        ai = thinking["ai"]
+        elapsed = time.time() - thinking["start"]
+        nps = ai.nodes_evaluated / elapsed if elapsed > 0 else 0.0
+        dots = "." * (int(elapsed * 2) % 4)
+        text = f"AI thinking{dots:<3} {elapsed:.1f}s, {nps:.0f} nodes/s"
+        if thinking["depth"] is not None:
+            text += f", depth {thinking['depth']}, best {thinking['move']}"
+        self.screen.blit(self.font.render(text, True, self.RED),
+                         (10, self.HEIGHT - self.MARGIN + 5))
+        self.screen.blit(self.font.render(thinking["keys"], True, self.BLACK),
+                         (10, self.HEIGHT - self.MARGIN + 27))
+    
+    def record_iteration(self, ai: GomokuAI, info: dict):
+        """Hook that records the depth and best move of every finished search iteration."""
+        if self.thinking and self.thinking["ai"] is ai:
+            self.thinking["depth"] = info["depth"]
+            self.thinking["move"] = info["move"]
+    
+    def start_ai_move(self, ai: GomokuAI, executor: ThreadPoolExecutor, keys: str) -> Future:
+        """
+        Start an AI search in the background.
+        
+        The AI searches a copy of the board, so the GUI can keep drawing the
+        real one while the search plays moves on it.
+        
+        Args:
+            ai: The AI to move
+            executor: Executor the search runs in
+            keys: Help text for the keys that control the search
+            
+        Returns:
+            Future of the AI's move
+        """
+        if self.record_iteration not in ai.hooks["iteration"]:
+            ai.add_hook("iteration", self.record_iteration)
+        self.thinking = {"ai": ai, "start": time.time(), "depth": None, "move": None, "keys": keys,
+                         "stopped": False}
+        return executor.submit(ai.get_move, self.board.copy_board())
+    
+    def stop_ai_move(self):
+        """
+        Make the thinking AI play the best move it has found so far.
+        
+        A stop that arrives before the search thread reaches get_move would be
+        cleared when the search starts, so the GUI loops repeat it every frame
+        until the search returns (see keep_stopping).
+        """
+        self.thinking["stopped"] = True
+        self.thinking["ai"].stop()
+    
+    def keep_stopping(self):
+        """Repeat the stop of an AI search that was told to move now."""
+        if self.thinking and self.thinking["stopped"]:
+            self.thinking["ai"].stop()
+    
+    def finish_ai_move(self, search: Future):
+        """Stop an AI search and wait until it has returned."""
+        self.stop_ai_move()
+        while not search.done():
+            time.sleep(0.01)
+            self.keep_stopping()
 
     def get_cell_from_pos(self, pos):
         x, y = pos
@@ -149,52 +221,81 @@ class GomokuGame:
             return (row, col)
         return None
     
-    def human_vs_ai(self, ai_algorithm: str = "minimax", ai_depth: int = 3, ai_player: int = 2):
+    def human_vs_ai(self, ai_algorithm: str = "minimax", ai_depth: int = 3, ai_player: int = 2,
+                    ai_time_limit: Optional[float] = None):
         """
         Play a Human vs AI game.
         
+        The AI keeps its search tables between moves and ponders while the
+        human thinks.
+        
         Args:
-            ai_algorithm: "minimax" or "alphabeta"
+            ai_algorithm: "minimax", "alphabeta", "pvs" or "mcts"
             ai_depth: AI search depth
             ai_player: Which player the AI controls (1 or 2)
+            ai_time_limit: Time budget per AI move in seconds (None for fixed depth)
         """
-        ai = GomokuAI(ai_player, ai_algorithm, ai_depth)
-        
-        # If AI is player 1, make initial move
-        if ai_player == 1 and not self.board.game_over:
-            row, col = ai.get_move(self.board)
-            self.board.make_move(row, col)
+        ai = GomokuAI(ai_player, ai_algorithm, ai_depth, time_limit=ai_time_limit, persistent=True)
         
         if self.gui_enabled:
-            self.draw_board()
+            # The AI searches in a background thread so the window keeps
+            # handling events; Space makes it move now, Esc takes back the
+            # human move it is answering
+            executor = ThreadPoolExecutor(max_workers=1)
+            search = None  # Future of the running AI search
+            cancelled = False
             running = True
             
             while running:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         running = False
-                        pygame.quit()
-                        return
+                        if search:
+                            self.stop_ai_move()
+                    
+                    elif event.type == pygame.KEYDOWN and search:
+                        if event.key == pygame.K_ESCAPE and self.board.move_stack:
+                            cancelled = True  # Nothing to take back before the AI's first move
+                            self.stop_ai_move()
+                        elif event.key == pygame.K_SPACE:
+                            self.stop_ai_move()  # Play the best move found so far
                     
-                    if event.type == pygame.MOUSEBUTTONDOWN and not self.board.game_over:
-                        if self.board.current_player != ai_player:  # Human's turn
+                    elif event.type == pygame.MOUSEBUTTONDOWN and not self.board.game_over:
+                        if self.board.current_player != ai_player and not search:  # Human's turn
                             pos = pygame.mouse.get_pos()
                             cell = self.get_cell_from_pos(pos)
                             
                             if cell and self.board.is_valid_move(*cell):
                                 row, col = cell
                                 self.board.make_move(row, col)
-                                self.draw_board()
-                                
-                                # If game not over, AI makes its move
-                                if not self.board.game_over:
-                                    pygame.display.flip()  # Update display before AI thinks
-                                    row, col = ai.get_move(self.board)
-                                    self.board.make_move(row, col)
-                                    self.draw_board()
                 
-                pygame.time.wait(100)  # Small delay to reduce CPU usage
+                # The AI's moves, its first one included, are searched in the background
+                if (running and search is None and not self.board.game_over
+                        and self.board.current_player == ai_player):
+                    keys = "Space: move now"
+                    if self.board.move_stack:
+                        keys += ", Esc: take back your move"
+                    search = self.start_ai_move(ai, executor, keys)
                 
+                if search and search.done():
+                    row, col = search.result()
+                    search = None
+                    self.thinking = None
+                    if cancelled:
+                        self.board.pop()  # Give the turn back to the human
+                        cancelled = False
+                    elif running:
+                        self.board.make_move(row, col)
+                        ai.ponder(self.board)
+                
+                self.keep_stopping()
+                self.draw_board()
+                self.clock.tick(self.FPS)
+                
+            if search:
+                self.finish_ai_move(search)  # Let the stopped search finish before closing
+            executor.shutdown()
+            ai.close()
             pygame.quit()
         else:
             # Console-based play
@@ -218,10 +319,12 @@ class GomokuGame:
                     print(f"AI (Player {ai_player}) is thinking...")
                     row, col = ai.get_move(self.board)
                     self.board.make_move(row, col)
+                    ai.ponder(self.board)
                     self.board.print_board()
                     print(f"AI played at ({row}, {col})")
             
             # Game over
+            ai.close()
             self.board.print_board()
             if self.board.winner:
                 print(f"Player {self.board.winner} wins!")
@@ -230,46 +333,77 @@ class GomokuGame:
 
         
     def ai_vs_ai(self, ai1_algorithm: str = "minimax", ai2_algorithm: str = "alphabeta", 
-                ai1_depth: int = 3, ai2_depth: int = 3, max_moves: int = 100):
+                ai1_depth: int = 3, ai2_depth: int = 3, max_moves: int = 100,
+                time_limit: Optional[float] = None):
         """
         Play an AI vs AI game.
         
         Args:
-            ai1_algorithm: Algorithm for player 1 ("minimax" or "alphabeta")
-            ai2_algorithm: Algorithm for player 2 ("minimax" or "alphabeta")
+            ai1_algorithm: Algorithm for player 1 ("minimax", "alphabeta", "pvs" or "mcts")
+            ai2_algorithm: Algorithm for player 2 ("minimax", "alphabeta", "pvs" or "mcts")
             ai1_depth: Search depth for player 1
             ai2_depth: Search depth for player 2
             max_moves: Maximum number of moves to prevent infinite games
+            time_limit: Time budget per move in seconds for both AIs (None for fixed depth)
         """
-        ai1 = GomokuAI(1, ai1_algorithm, ai1_depth)
-        ai2 = GomokuAI(2, ai2_algorithm, ai2_depth)
+        ai1 = GomokuAI(1, ai1_algorithm, ai1_depth, time_limit=time_limit, persistent=True)
+        ai2 = GomokuAI(2, ai2_algorithm, ai2_depth, time_limit=time_limit, persistent=True)
         
         move_count = 0
         
         print(f"AI1: {ai1_algorithm} (depth {ai1_depth}) vs AI2: {ai2_algorithm} (depth {ai2_depth})")
         
         if self.gui_enabled:
-            self.draw_board()
+            # Searches run in a background thread; Space makes the AI move
+            # now and Esc stops the game
+            executor = ThreadPoolExecutor(max_workers=1)
+            search = None  # Future of the running AI search
+            next_search_time = 0.0  # Moves are shown for a while before the next search
             running = True
             
             while running and not self.board.game_over and move_count < max_moves:
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
                         running = False
+                        if search:
+                            self.finish_ai_move(search)
+                        executor.shutdown()
+                        ai1.close()
+                        ai2.close()
                         pygame.quit()
                         return
+                    
+                    if event.type == pygame.KEYDOWN and search:
+                        if event.key == pygame.K_ESCAPE:
+                            running = False
+                            self.stop_ai_move()
+                        elif event.key == pygame.K_SPACE:
+                            self.stop_ai_move()
                 
-                # Current AI makes a move
-                current_ai = ai1 if self.board.current_player == 1 else ai2
-                print(f"AI Player {self.board.current_player} ({current_ai.algorithm}) is thinking...")
-                
-                pygame.display.flip()  # Update display before AI thinks
-                row, col = current_ai.get_move(self.board)
-                self.board.make_move(row, col)
-                move_count += 1
+                if search is None and time.time() >= next_search_time:
+                    # Current AI makes a move
+                    current_ai = ai1 if self.board.current_player == 1 else ai2
+                    print(f"AI Player {self.board.current_player} ({current_ai.algorithm}) is thinking...")
+                    search = self.start_ai_move(current_ai, executor,
+                                                "Space: move now, Esc: stop the game")
+                elif search and search.done():
+                    row, col = search.result()
+                    search = None
+                    self.thinking = None
+                    if running:
+                        self.board.make_move(row, col)
+                        move_count += 1
+                    next_search_time = time.time() + 0.5  # Pause for visualization
                 
+                self.keep_stopping()
                 self.draw_board()
-                pygame.time.wait(500)  # Pause for visualization
+                self.clock.tick(self.FPS)
+            
+            if search:
+                self.finish_ai_move(search)  # Let the stopped search finish before closing
+            executor.shutdown()
+            ai1.close()
+            ai2.close()
                 
             # Game over
             if move_count >= max_moves:
@@ -298,6 +432,8 @@ class GomokuGame:
                 print(f"AI Player {3 - self.board.current_player} played at ({row}, {col})")
             
             # Game over
+            ai1.close()
+            ai2.close()
             self.board.print_board()
 
             if move_count >= max_moves:
@@ -313,3 +449,44 @@ class GomokuGame:
                 else:
                     print("Game Over - Draw! (Maximum moves reached)")
 
+
+    def play_match(self, ai1: GomokuAI, ai2: GomokuAI, max_moves: int = 225,
+                   opening: Optional[List[Tuple[int, int]]] = None) -> dict:
+        """
+        Play one AI vs AI game without any output, for batch play.
+        
+        Args:
+            ai1: AI playing as player 1
+            ai2: AI playing as player 2
+            max_moves: Maximum number of moves, opening included, before the game is a draw
+            opening: Moves played before the AIs take over
+            
+        Returns:
+            Dictionary with the moves, the winner (None for a draw), and the
+            time and node count of every AI move (None for opening moves)
+        """
+        self.board.reset()
+        moves, move_times, nodes = [], [], []
+        
+        for row, col in opening or []:
+            if not self.board.make_move(row, col):
+                raise ValueError(f"Invalid opening move: ({row}, {col})")
+            moves.append((row, col))
+            move_times.append(None)
+            nodes.append(None)
+        
+        while not self.board.game_over and len(moves) < max_moves:
+            current_ai = ai1 if self.board.current_player == 1 else ai2
+            start_time = time.time()
+            row, col = current_ai.get_move(self.board)
+            move_times.append(time.time() - start_time)
+            nodes.append(current_ai.nodes_evaluated)
+            self.board.make_move(row, col)
+            moves.append((row, col))
+        
+        return {
+            "moves": moves,
+            "winner": self.board.winner,
+            "move_times": move_times,
+            "nodes": nodes,
+        }
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Tuple, List
+from board import GomokuBoard
+from player import GomokuAI
+
+# Fixed positions stored as the moves that lead to them (player 1 moves first)
+POSITIONS = [
+    {"name": "opening-center", "category": "opening", "moves": [(7, 7)]},
+    {"name": "opening-diagonal", "category": "opening", "moves": [(7, 7), (7, 8), (8, 8)]},
+    {"name": "midgame-column", "category": "midgame",
+     "moves": [(7, 7), (7, 8), (8, 7), (6, 7), (9, 7), (8, 8), (6, 8)]},
+    {"name": "midgame-cross", "category": "midgame",
+     "moves": [(7, 7), (8, 6), (6, 6), (8, 8), (8, 7), (9, 7), (5, 7), (7, 5), (6, 7), (4, 7)]},
+    {"name": "tactical-open-three", "category": "tactical",
+     "moves": [(7, 7), (8, 8), (7, 8), (6, 6), (7, 9), (9, 9)]},
+    {"name": "tactical-double-threat", "category": "tactical",
+     "moves": [(7, 7), (6, 8), (8, 8), (6, 6), (6, 7), (5, 7), (9, 7), (7, 9), (8, 7), (10, 7),
+               (8, 6), (4, 6)]},
+    {"name": "endgame-cluster", "category": "endgame",
+     "moves": [(5, 8), (8, 5), (6, 8), (7, 9), (8, 4), (10, 7), (5, 5), (9, 7), (8, 10), (8, 7),
+               (10, 5), (5, 9), (5, 10), (9, 4), (9, 10), (4, 5), (10, 8), (4, 6), (10, 4), (10, 10),
+               (6, 7), (8, 9), (7, 5), (6, 4), (6, 9), (7, 10)]},
+    {"name": "endgame-crowded", "category": "endgame",
+     "moves": [(9, 10), (6, 7), (8, 10), (7, 8), (6, 8), (8, 7), (8, 5), (6, 9), (4, 10), (9, 9),
+               (5, 9), (10, 6), (8, 8), (8, 4), (10, 8), (6, 6), (4, 4), (7, 10), (9, 7), (4, 6),
+               (10, 4), (7, 5), (7, 9), (8, 6), (4, 8), (5, 7)]},
+]
+
+# Search depths run for each algorithm
+DEPTHS = {"minimax": [0, 1], "alphabeta": [1, 2], "pvs": [1, 2]}
+
+POSITION_SIZE = 15  # Board size the positions are written for
+# Board sizes of the large-board scaling benchmark (--sizes)
+SCALING_SIZES = [15, 19, 50, 100]
+
+
+def make_position(moves: List[Tuple[int, int]], size: int = POSITION_SIZE,
+                  backend: str = "numpy") -> GomokuBoard:
+    """
+    Build a board by playing a list of moves.
+
+    On boards larger than POSITION_SIZE the moves are shifted so the
+    position stays in the middle of the board.
+
+    Args:
+        moves: Moves in the order they are played, on a POSITION_SIZE board
+        size: The size of the board
+        backend: Cell storage of the board (see GomokuBoard.BACKENDS)
+
+    Returns:
+        The board after the moves
+    """
+    board = GomokuBoard(size, backend=backend)
+    offset = max(0, (size - POSITION_SIZE) // 2)
+    for row, col in moves:
+        row, col = row + offset, col + offset
+        if not board.make_move(row, col):
+            raise ValueError(f"Invalid move in benchmark position: ({row}, {col})")
+    if board.game_over:
+        raise ValueError("Benchmark position is already decided")
+    return board
+
+
+def run_search(position: dict, algorithm: str, depth: int, repeat: int = 1,
+               size: int = POSITION_SIZE, backend: str = "numpy", workers: int = 1) -> dict:
+    """
+    Search a position to a fixed depth and measure it.
+
+    The threat solver is off so every position is searched; each repetition
+    uses a fresh AI, so the transposition table starts empty.
+
+    Args:
+        position: Entry of POSITIONS
+        algorithm: "minimax", "alphabeta" or "pvs"
+        depth: Search depth
+        repeat: Number of searches; the fastest one is reported
+        size: The size of the board the position is placed on
+        backend: Cell storage of the board
+        workers: Number of processes of the search; with more than one the
+                 search is also repeated with one worker to measure the speedup
+
+    Returns:
+        Dictionary with the chosen move, nodes, time to depth, nodes per
+        second and, for a parallel search, the speedup over one worker
+    """
+    board = make_position(position["moves"], size, backend)
+    best_time = None
+    speedup = None
+    for _ in range(repeat):
+        ai = GomokuAI(board.current_player, algorithm, depth, threat_search=False, verbose=False,
+                      workers=workers, measure_speedup=workers > 1)
+        start_time = time.perf_counter()
+        move = ai.get_move(board)
+        elapsed_time = time.perf_counter() - start_time
+        if workers > 1:
+            # get_move also ran the serial search; only the parallel one counts
+            elapsed_time = ai.iteration_times[-1]
+            ai.close()
+        if best_time is None or elapsed_time < best_time:
+            best_time = elapsed_time
+            speedup = ai.parallel_speedup
+
+    return {
+        "position": position["name"],
+        "category": position["category"],
+        "algorithm": algorithm,
+        "depth": depth,
+        "size": size,
+        "backend": backend,
+        "workers": workers,
+        "speedup": speedup,
+        "move": list(move),
+        "nodes": ai.nodes_evaluated,
+        "time": best_time,
+        "nps": ai.nodes_evaluated / best_time if best_time > 0 else 0.0,
+    }
+
+
+def run_benchmark(positions: List[dict] = POSITIONS, depths: dict = DEPTHS,
+                  repeat: int = 1, sizes: List[int] = [POSITION_SIZE],
+                  backend: str = "numpy", workers: int = 1) -> dict:
+    """
+    Run every algorithm and depth on every position.
+
+    Args:
+        positions: Positions to search (see POSITIONS)
+        depths: Algorithm -> list of search depths
+        repeat: Number of searches per measurement
+        sizes: Board sizes every position is searched on
+        backend: Cell storage of the boards
+        workers: Number of processes of every search
+
+    Returns:
+        Dictionary with the machine description and one result per search
+    """
+    results = []
+    for size in sizes:
+        for position in positions:
+            for algorithm, algorithm_depths in depths.items():
+                for depth in algorithm_depths:
+                    result = run_search(position, algorithm, depth, repeat, size, backend, workers)
+                    results.append(result)
+                    line = (f"{size:>3} {result['position']:<24} {algorithm:<10} depth {depth}: "
+                            f"move {tuple(result['move'])}, {result['nodes']} nodes, "
+                            f"{result['time']:.3f}s, {result['nps']:.0f} nodes/s")
+                    if result["speedup"] is not None:
+                        line += f", {result['speedup']:.2f}x over one worker"
+                    print(line)
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "backend": backend,
+        "workers": workers,
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.1) -> List[str]:
+    """
+    Compare benchmark results with a saved baseline.
+
+    Args:
+        results: Output of run_benchmark
+        baseline: Earlier output of run_benchmark
+        tolerance: Allowed relative drop in nodes per second
+
+    Returns:
+        One message per regression: a nodes-per-second drop beyond the
+        tolerance, or a different chosen move
+    """
+    def key(result: dict) -> tuple:
+        # Results saved before board sizes, backends and workers were
+        # benchmarked are all on POSITION_SIZE with the NumPy backend and one worker
+        return (result["position"], result["algorithm"], result["depth"],
+                result.get("size", POSITION_SIZE), result.get("backend", "numpy"),
+                result.get("workers", 1))
+
+    previous = {key(r): r for r in baseline["results"]}
+    problems = []
+    for result in results["results"]:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        name = f"{result['position']} {result['algorithm']} depth {result['depth']}"
+        if result.get("size", POSITION_SIZE) != POSITION_SIZE:
+            name += f" on {result['size']}x{result['size']}"
+        if result.get("backend", "numpy") != "numpy":
+            name += f" ({result['backend']} backend)"
+        if result.get("workers", 1) > 1:
+            name += f" with {result['workers']} workers"
+        if result["move"] != old["move"]:
+            problems.append(f"{name}: move changed from {tuple(old['move'])} to {tuple(result['move'])}")
+        if old["nps"] > 0 and result["nps"] < old["nps"] * (1 - tolerance):
+            problems.append(f"{name}: {result['nps']:.0f} nodes/s, down "
+                            f"{1 - result['nps'] / old['nps']:.1%} from {old['nps']:.0f}")
+    return problems
+
+
+def main():
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the Gomoku search on fixed positions.")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative drop in nodes per second (default 0.1)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Searches per measurement, the fastest is reported")
+    parser.add_argument("--category", action="append",
+                        help="Only run positions of this category (can be repeated)")
+    parser.add_argument("--sizes", type=int, nargs="*",
+                        help="Board sizes to search the positions on; without values, "
+                             f"the scaling sizes {' '.join(map(str, SCALING_SIZES))}")
+    parser.add_argument("--backend", choices=GomokuBoard.BACKENDS, default="numpy",
+                        help="Cell storage of the boards (default numpy)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes per search; above 1 the speedup over one worker "
+                             "is measured too (default 1)")
+    args = parser.parse_args()
+
+    positions = [p for p in POSITIONS if not args.category or p["category"] in args.category]
+    if args.sizes is None:
+        sizes = [POSITION_SIZE]
+    else:
+        sizes = args.sizes or SCALING_SIZES
+    results = run_benchmark(positions, DEPTHS, args.repeat, sizes, args.backend, args.workers)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(results, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}")
+        if problems:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,138 @@
 import numpy as np
+import random
 import time
 import pygame
 import sys
 from typing import Tuple, List, Optional
+from evaluator import PatternEvaluator
+from bitboard import BitBoard
+from sparse_grid import SparseGrid
+
+# Fixed seed so position hashes are identical across runs and processes
+ZOBRIST_SEED = 0x9E3779B9
+_zobrist_cache = {}
+
+
+def zobrist_keys(size: int) -> List[List[int]]:
+    """
+    Get the Zobrist keys for a board of the given size.
+    
+    Args:
+        size: The size of the board
+        
+    Returns:
+        Two lists (one per player) of 64-bit keys indexed by row * size + col
+    """
+    keys = _zobrist_cache.get(size)
+    if keys is None:
+        rng = random.Random(ZOBRIST_SEED + size)
+        keys = [[rng.getrandbits(64) for _ in range(size * size)] for _ in range(2)]
+        _zobrist_cache[size] = keys
+    return keys
+
+
+_neighborhood_cache = {}
+
+
+def neighborhoods(size: int, distance: int) -> List[List[Tuple[int, int]]]:
+    """
+    Get the cells within a distance of every cell of the board.
+    
+    Args:
+        size: The size of the board
+        distance: Maximum distance along rows and columns
+        
+    Returns:
+        Lists of (row, col) tuples indexed by row * size + col
+    """
+    cells = _neighborhood_cache.get((size, distance))
+    if cells is None:
+        cells = []
+        for row in range(size):
+            for col in range(size):
+                cells.append([(r, c)
+                              for r in range(max(0, row - distance), min(size, row + distance + 1))
+                              for c in range(max(0, col - distance), min(size, col + distance + 1))])
+        _neighborhood_cache[(size, distance)] = cells
+    return cells
+
 
 class GomokuBoard:
     """Represents the Gomoku game board and game state."""
     
-    def __init__(self, size: int = 15):
+    BACKENDS = ("numpy", "bitboard", "sparse")
+    
+    def __init__(self, size: int = 15, candidate_distance: int = 2, backend: str = "numpy"):
         """
         Initialize the Gomoku board with the specified size.
         
         Args:
             size: The size of the board (size x size)
+            candidate_distance: Distance around stones kept in the candidate move set
+            backend: Cell storage, "numpy" for an int array, "bitboard" for
+                     one bitmask per player or "sparse" for a dict of the stones
+                     (all are indexed as board[row][col])
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown board backend: {backend}")
         self.size = size
-        self.board = np.zeros((size, size), dtype=int)  # 0: empty, 1: player 1, 2: player 2
+        self.candidate_distance = candidate_distance
+        self.backend = backend
+        self.board = self._new_grid()  # 0: empty, 1: player 1, 2: player 2
         self.current_player = 1  # Player 1 starts
         self.last_move = None
         self.winner = None
         self.game_over = False
+        self.zobrist = zobrist_keys(size)
+        self.hash = 0  # Zobrist hash of the stones on the board
+        self.stone_count = 0
+        self.evaluator = PatternEvaluator(size)  # Incremental pattern scores
+        # Stones within candidate_distance of each cell, and the empty cells with any
+        self.neighbor_counts = {}
+        self.candidates = set()
+        self.neighborhoods = neighborhoods(size, candidate_distance)
+        self.move_stack = []  # Moves played with push, oldest first
         
+    def __getstate__(self):
+        # The Zobrist keys, neighborhoods and pattern tables make a pickled
+        # board large, so a board whose stones were all played with push is
+        # sent as its moves and replayed on the other side
+        if len(self.move_stack) == self.stone_count:
+            return {"replay": (self.size, self.candidate_distance, self.backend,
+                               list(self.move_stack), self.current_player)}
+        return self.__dict__.copy()
+    
+    def __setstate__(self, state):
+        if "replay" not in state:
+            self.__dict__.update(state)
+            return
+        size, candidate_distance, backend, moves, current_player = state["replay"]
+        self.__init__(size, candidate_distance, backend)
+        for move in moves:
+            self.push(move)
+        self.current_player = current_player
+    
+    def _new_grid(self):
+        """Create an empty cell grid for the board's backend."""
+        if self.backend == "bitboard":
+            return BitBoard(self.size)
+        if self.backend == "sparse":
+            return SparseGrid(self.size)
+        return np.zeros((self.size, self.size), dtype=int)
+    
     def reset(self):
         """Reset the game board to its initial state."""
-        self.board = np.zeros((self.size, self.size), dtype=int)
+        self.board = self._new_grid()
         self.current_player = 1
         self.last_move = None
         self.winner = None
         self.game_over = False
+        self.hash = 0
+        self.stone_count = 0
+        self.evaluator = PatternEvaluator(self.size)
+        self.neighbor_counts = {}
+        self.candidates = set()
+        self.move_stack = []
         
     def is_valid_move(self, row: int, col: int) -> bool:
         """
@@ -44,25 +149,123 @@ class GomokuBoard:
                 0 <= col < self.size and 
                 self.board[row][col] == 0)
     
-    def make_move(self, row: int, col: int) -> bool:
-        if self.game_over or not self.is_valid_move(row, col):
-            return False
+    def place_stone(self, row: int, col: int, player: int):
+        """
+        Put a stone on an empty cell and update the position hash, pattern
+        scores and candidate moves.
+        
+        Unlike make_move this does not validate the move or change the
+        player to move, so the search can use it to try moves cheaply.
+        
+        Args:
+            row: Row index of the stone
+            col: Column index of the stone
+            player: Player owning the stone (1 or 2)
+        """
+        self.board[row, col] = player
+        self.hash ^= self.zobrist[player - 1][row * self.size + col]
+        self.stone_count += 1
+        self.evaluator.update(row, col, 0, player)
+        self._update_neighbors(row, col, 1)
+    
+    def remove_stone(self, row: int, col: int):
+        """
+        Take a stone placed with place_stone back off the board.
+        
+        Args:
+            row: Row index of the stone
+            col: Column index of the stone
+        """
+        player = int(self.board[row, col])
+        self.board[row, col] = 0
+        self.hash ^= self.zobrist[player - 1][row * self.size + col]
+        self.stone_count -= 1
+        self.evaluator.update(row, col, player, 0)
+        self._update_neighbors(row, col, -1)
+    
+    def _update_neighbors(self, row: int, col: int, delta: int):
+        """
+        Adjust the neighbor counts around a cell and keep the candidate set in sync.
         
-        self.board[row][col] = self.current_player
-        self.last_move = (row, col)
+        A cell with a count of zero has no stone within candidate_distance,
+        itself included, so it is known to be empty without reading the board.
+        
+        Args:
+            row: Row index of the stone that was placed or removed
+            col: Column index of the stone that was placed or removed
+            delta: 1 when the stone was placed, -1 when it was removed
+        """
+        counts = self.neighbor_counts
+        candidates = self.candidates
+        cell = (row, col)
+        if delta > 0:
+            for neighbor in self.neighborhoods[row * self.size + col]:
+                count = counts.get(neighbor, 0) + 1
+                counts[neighbor] = count
+                if count == 1:
+                    candidates.add(neighbor)  # First stone nearby
+            candidates.discard(cell)  # The cell itself is now occupied
+        else:
+            for neighbor in self.neighborhoods[row * self.size + col]:
+                count = counts[neighbor] - 1
+                if count:
+                    counts[neighbor] = count
+                else:
+                    del counts[neighbor]
+                    candidates.discard(neighbor)  # Last stone nearby is gone
+            if cell in counts:
+                candidates.add(cell)  # The cell itself is empty again
+    
+    def push(self, move: Tuple[int, int]):
+        """
+        Play a move for the current player without validating it.
+        
+        This is the search's make/unmake API: like make_move it updates the
+        last move, the winner and the player to move along with the hash,
+        pattern scores and candidates, and the move can be taken back with
+        pop. The move must be on an empty cell of a game that is not over.
+        
+        Args:
+            move: (row, col) of the move
+        """
+        row, col = move
+        self.place_stone(row, col, self.current_player)
+        self.move_stack.append(move)
+        self.last_move = move
         
         # Check if the current player has won
         if self.check_win(row, col):
             self.winner = self.current_player
             self.game_over = True
         # Check if the board is full (draw)
-        elif np.count_nonzero(self.board) == self.size * self.size:
+        elif self.stone_count == self.size * self.size:
             self.game_over = True
             self.winner = None  # Explicitly set to None for draw
         else:
             # Switch player
             self.current_player = 3 - self.current_player  # Toggle between 1 and 2
-            
+    
+    def pop(self) -> Tuple[int, int]:
+        """
+        Take back the last move played with push (or make_move).
+        
+        Returns:
+            (row, col) of the move taken back
+        """
+        move = self.move_stack.pop()
+        if not self.game_over:
+            self.current_player = 3 - self.current_player  # A finished game keeps the mover
+        self.remove_stone(*move)
+        self.last_move = self.move_stack[-1] if self.move_stack else None
+        self.winner = None
+        self.game_over = False  # push never plays on a finished game
+        return move
+    
+    def make_move(self, row: int, col: int) -> bool:
+        if self.game_over or not self.is_valid_move(row, col):
+            return False
+        
+        self.push((row, col))
         return True
     
     def check_win(self, row: int, col: int) -> bool:
@@ -76,6 +279,9 @@ class GomokuBoard:
         Returns:
             True if the current player has won, False otherwise
         """
+        if self.backend != "numpy":
+            return self.board.five_through(row, col)
+        
         player = self.board[row][col]
         directions = [
             [(0, 1), (0, -1)],   # Horizontal
@@ -120,6 +326,9 @@ class GomokuBoard:
         """
         Get available cells that are neighbors to existing stones.
         
+        For the board's candidate_distance this reads the incrementally
+        maintained candidate set instead of rescanning the board.
+        
         Args:
             distance: Maximum Manhattan distance to consider as neighbor
             
@@ -127,25 +336,63 @@ class GomokuBoard:
             List of (row, col) tuples representing available neighbor moves
         """
         # If board is empty, return center
-        if np.count_nonzero(self.board) == 0:
+        if self.stone_count == 0:
             center = self.size // 2
             return [(center, center)]
         
-        neighbors = set()
-        for r in range(self.size):
-            for c in range(self.size):
-                if self.board[r][c] != 0:  # If there's a stone here
-                    # Check neighbors within specified distance
-                    for dr in range(-distance, distance + 1):
-                        for dc in range(-distance, distance + 1):
-                            nr, nc = r + dr, c + dc
-                            if (0 <= nr < self.size and 
-                                0 <= nc < self.size and 
-                                self.board[nr][nc] == 0):
-                                neighbors.add((nr, nc))
+        if distance == self.candidate_distance:
+            neighbors = self.candidates
+        else:
+            neighbors = set()
+            for r, c, _ in self.stones():
+                # Check neighbors within specified distance
+                for dr in range(-distance, distance + 1):
+                    for dc in range(-distance, distance + 1):
+                        nr, nc = r + dr, c + dc
+                        if (0 <= nr < self.size and 
+                            0 <= nc < self.size and 
+                            self.board[nr][nc] == 0):
+                            neighbors.add((nr, nc))
         
         return list(neighbors) if neighbors else self.get_available_moves()
     
+    def stones(self) -> List[Tuple[int, int, int]]:
+        """
+        List the stones on the board.
+        
+        Returns:
+            List of (row, col, player), found without scanning the empty cells
+            when every stone was played with push
+        """
+        board = self.board
+        if len(self.move_stack) == self.stone_count:
+            return [(r, c, int(board[r][c])) for r, c in self.move_stack]
+        if self.backend == "sparse":
+            return [(r, c, player) for (r, c), player in board]
+        grid = board.tolist()
+        return [(r, c, grid[r][c]) for r in range(self.size) for c in range(self.size) if grid[r][c]]
+    
+    def active_region(self, margin: int = 0) -> Tuple[int, int, int, int]:
+        """
+        Get the bounding box of the stones, widened by a margin.
+        
+        Args:
+            margin: Cells added on every side (the box is clipped to the board)
+            
+        Returns:
+            (top, left, bottom, right) with bottom and right exclusive; the
+            center cell, widened by the margin, on an empty board
+        """
+        stones = self.stones()
+        if stones:
+            rows = [r for r, _, _ in stones]
+            cols = [c for _, c, _ in stones]
+            top, left, bottom, right = min(rows), min(cols), max(rows), max(cols)
+        else:
+            top = left = bottom = right = self.size // 2
+        return (max(0, top - margin), max(0, left - margin),
+                min(self.size, bottom + margin + 1), min(self.size, right + margin + 1))
+    
     def print_board(self):
         """Print the current state of the board to the console."""
         symbols = {0: '.', 1: 'X', 2: 'O'}
@@ -164,11 +411,18 @@ class GomokuBoard:
     def copy_board(original_board: 'GomokuBoard') -> 'GomokuBoard':
         """Create a copy of the board to simulate a move."""
         from copy import deepcopy
-        clone = GomokuBoard(original_board.size)
-        clone.board = np.copy(original_board.board)
+        clone = GomokuBoard(original_board.size, original_board.candidate_distance,
+                            original_board.backend)
+        clone.board = original_board.board.copy()
         clone.current_player = original_board.current_player
         clone.last_move = original_board.last_move
         clone.winner = original_board.winner
         clone.game_over = original_board.game_over
+        clone.hash = original_board.hash
+        clone.stone_count = original_board.stone_count
+        clone.evaluator = original_board.evaluator.copy()
+        clone.neighbor_counts = dict(original_board.neighbor_counts)
+        clone.candidates = set(original_board.candidates)
+        clone.move_stack = list(original_board.move_stack)
         return clone
 
@@ -0,0 +1,415 @@
+import hashlib
+import os
+import numpy as np
+from typing import List
+
+# Line families: horizontal, vertical, diagonal \ and diagonal /
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Packed line codes use 2 bits per cell: 0 empty, 1 and 2 stones, 3 off the board
+EDGE = 3
+REACH = 4  # Cells on each side of a stone that decide its pattern score
+WINDOW = 2 * REACH + 1
+WINDOW_MASK = (1 << 2 * WINDOW) - 1
+
+WIN_SCORE = 10000    # move_score of a move that completes five in a row
+THREAT_SCORE = 200   # move_score of a move that makes an open three or better
+
+# Directory the pattern table is cached in
+CACHE_DIR = os.environ.get("GOMOKU_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "gomoku"))
+
+
+def pattern_score(consecutive: int, open_ends: int) -> int:
+    """
+    Score a run of stones by its length and number of open ends.
+
+    Args:
+        consecutive: Number of stones in the run
+        open_ends: Number of empty cells bordering the run (0, 1 or 2)
+
+    Returns:
+        Score for the pattern
+    """
+    if consecutive >= 5:
+        return 10000  # Win condition
+    elif consecutive == 4:
+        if open_ends == 2:
+            return 5000  # Open four (will lead to win)
+        elif open_ends == 1:
+            return 500   # Four with one open end
+    elif consecutive == 3:
+        if open_ends == 2:
+            return 200   # Open three
+        elif open_ends == 1:
+            return 50    # Three with one open end
+    elif consecutive == 2:
+        if open_ends == 2:
+            return 10    # Open two
+        elif open_ends == 1:
+            return 5     # Two with one open end
+    elif consecutive == 1:
+        if open_ends > 0:
+            return 1     # Single stone with open end(s)
+
+    return 0  # Default score
+
+
+def line_score(values: List[int]) -> int:
+    """
+    Score one line of the board from player 1's point of view.
+
+    Every stone of a run scores the run's pattern, so a run of length k
+    contributes k times its pattern score, the same as scoring each stone
+    with GomokuAI.evaluate_pattern.
+
+    Args:
+        values: Cell values along the line (0: empty, 1: player 1, 2: player 2)
+
+    Returns:
+        Player 1's pattern score minus player 2's on this line
+    """
+    score = 0
+    n = len(values)
+    i = 0
+    while i < n:
+        player = values[i]
+        if player == 0:
+            i += 1
+            continue
+
+        # Find the end of the run starting at i
+        j = i + 1
+        while j < n and values[j] == player:
+            j += 1
+
+        open_ends = 0
+        if i > 0 and values[i - 1] == 0:
+            open_ends += 1
+        if j < n and values[j] == 0:
+            open_ends += 1
+
+        run_score = (j - i) * pattern_score(j - i, open_ends)
+        score += run_score if player == 1 else -run_score
+        i = j
+
+    return score
+
+
+def build_pattern_table() -> np.ndarray:
+    """
+    Score every packed window of WINDOW cells by the stone in its middle.
+
+    A stone's score is pattern_score of the run it belongs to, and every run
+    of at most four stones fits in the window together with both of its end
+    cells, while any longer run scores a five whatever lies beyond the window.
+    So the score of a line is the sum of the table entries of its stones'
+    windows, which is line_score.
+
+    Returns:
+        Array of 4 ** WINDOW signed scores (positive for a player 1 stone,
+        negative for player 2, 0 when the middle cell has no stone)
+    """
+    codes = np.arange(1 << 2 * WINDOW)
+    cells = [(codes >> 2 * i) & 3 for i in range(WINDOW)]
+    scores = np.array([[pattern_score(k, ends) for ends in range(3)] for k in range(WINDOW + 1)])
+
+    table = np.zeros(len(codes), dtype=np.int32)
+    for player, sign in ((1, 1), (2, -1)):
+        consecutive = np.ones(len(codes), dtype=np.int64)
+        open_ends = np.zeros(len(codes), dtype=np.int64)
+        for step in (1, -1):
+            running = np.ones(len(codes), dtype=bool)  # Run not yet ended on this side
+            for distance in range(1, REACH + 1):
+                cell = cells[REACH + step * distance]
+                open_ends += running & (cell == 0)
+                running &= cell == player
+                consecutive += running
+        table += np.where(cells[REACH] == player, sign * scores[consecutive, open_ends], 0).astype(np.int32)
+    return table
+
+
+_pattern_table = None
+
+
+def pattern_table() -> List[int]:
+    """
+    Get the pattern table, loading it from the disk cache or building it once.
+
+    The cache file name includes a digest of the pattern scores, so changing
+    pattern_score builds a new table.
+
+    Returns:
+        The table as a list indexed by packed window code
+    """
+    global _pattern_table
+    if _pattern_table is None:
+        scores = [pattern_score(k, ends) for k in range(WINDOW + 1) for ends in range(3)]
+        digest = hashlib.sha1(repr(scores).encode()).hexdigest()[:12]
+        path = os.path.join(CACHE_DIR, f"pattern_table_{WINDOW}_{digest}.npy")
+        try:
+            table = np.load(path)
+        except (OSError, ValueError):
+            table = build_pattern_table()
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as f:
+                    np.save(f, table)
+                os.replace(temp_path, path)  # Other processes never see a partial file
+            except OSError:
+                pass  # An unwritable cache only costs the build on the next start
+        _pattern_table = table.tolist()  # Lists index faster than arrays one entry at a time
+    return _pattern_table
+
+
+def line_index(size: int, dr: int, dc: int, row: int, col: int) -> int:
+    """
+    Get the index of the line through a cell within its family.
+
+    Args:
+        size: The size of the board
+        dr, dc: Direction of the line family
+        row, col: A cell on the line
+
+    Returns:
+        Index of the line in the family
+    """
+    if dr == 0:
+        return row
+    if dc == 0:
+        return col
+    if dc == 1:
+        return row - col + size - 1
+    return row + col
+
+
+_layout_cache = {}
+
+
+def line_layout(size: int):
+    """
+    Get the cells of every line and the line position of every cell.
+
+    Args:
+        size: The size of the board
+
+    Returns:
+        Cell lists per line family, and per family a list indexed by
+        row * size + col of (line index, position along the line)
+    """
+    layout = _layout_cache.get(size)
+    if layout is None:
+        lines = []
+        for dr, dc in DIRECTIONS:
+            family = [[] for _ in range(2 * size - 1)]
+            for r in range(size):
+                for c in range(size):
+                    family[line_index(size, dr, dc, r, c)].append((r, c))
+            lines.append([line for line in family if line])
+
+        cell_lines = []
+        for family in lines:
+            positions = [None] * (size * size)
+            for index, line in enumerate(family):
+                for position, (r, c) in enumerate(line):
+                    positions[r * size + c] = (index, position)
+            cell_lines.append(positions)
+        layout = (lines, cell_lines)
+        _layout_cache[size] = layout
+    return layout
+
+
+class PatternEvaluator:
+    """
+    Keeps the pattern score of every board line up to date as stones change.
+
+    Each line is held as a packed code with REACH off-board cells on both
+    ends, so a stone's window is a shift and a mask of the code and its
+    score is one pattern table lookup; the board cells are never read.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialize the evaluator for an empty board.
+
+        Args:
+            size: The size of the board (size x size)
+        """
+        self.size = size
+        self.table = pattern_table()
+        # Cells of every line grouped by line family, and where each cell lies on them
+        self.lines, self.cell_lines = line_layout(size)
+        self.line_scores = [[0] * len(family) for family in self.lines]
+        self.codes = [[self.empty_code(len(line)) for line in family] for family in self.lines]
+        self.score = 0  # Sum of all line scores, from player 1's point of view
+
+    @staticmethod
+    def empty_code(length: int) -> int:
+        """Get the packed code of an empty line with its off-board padding."""
+        code = 0
+        for i in range(REACH):
+            code |= EDGE << 2 * i
+            code |= EDGE << 2 * (REACH + length + i)
+        return code
+
+    def update(self, row: int, col: int, old: int, new: int):
+        """
+        Rescore the stones near a cell on the four lines through it after its value changed.
+
+        Args:
+            row, col: The cell that changed
+            old: Previous value of the cell (0 empty, 1 or 2 a stone)
+            new: New value of the cell
+        """
+        table = self.table
+        cell = row * self.size + col
+        for family in range(4):
+            index, position = self.cell_lines[family][cell]
+            codes = self.codes[family]
+            old_code = codes[index]
+            new_code = old_code + ((new - old) << 2 * (position + REACH))
+            codes[index] = new_code
+
+            # Only the stones within REACH of the cell see it in their window
+            delta = 0
+            for shift in range(2 * max(0, position - REACH), 2 * (position + REACH) + 1, 2):
+                delta += (table[(new_code >> shift) & WINDOW_MASK]
+                          - table[(old_code >> shift) & WINDOW_MASK])
+            self.line_scores[family][index] += delta
+            self.score += delta
+
+    def move_score(self, row: int, col: int, player: int) -> int:
+        """
+        Score the patterns a player would make by placing a stone on an empty cell.
+
+        Same result as the module's move_score, from the line codes.
+
+        Args:
+            row, col: The empty cell
+            player: Player placing the stone (1 or 2)
+
+        Returns:
+            Pattern score of the lines through the cell
+        """
+        table = self.table
+        cell = row * self.size + col
+        total = 0
+        for family in range(4):
+            index, position = self.cell_lines[family][cell]
+            code = self.codes[family][index] + (player << 2 * (position + REACH))
+            total += table[(code >> 2 * position) & WINDOW_MASK]
+        return total if player == 1 else -total
+
+    def copy(self) -> 'PatternEvaluator':
+        """Create a copy sharing the (read-only) line layout."""
+        clone = PatternEvaluator.__new__(PatternEvaluator)
+        clone.size = self.size
+        clone.table = self.table
+        clone.lines = self.lines
+        clone.cell_lines = self.cell_lines
+        clone.line_scores = [list(scores) for scores in self.line_scores]
+        clone.codes = [list(codes) for codes in self.codes]
+        clone.score = self.score
+        return clone
+
+
+class BatchEvaluator:
+    """
+    Scores a whole stack of boards at once with NumPy.
+
+    Every line of every board (all four directions) is gathered into one
+    array, padded with off-board cells, and the runs of each length are
+    found with shifted ANDs across the whole batch. The scores are the same
+    as PatternEvaluator.score, i.e. GomokuAI.evaluate for player 1.
+    """
+
+    OFF_BOARD = -1  # Padding value, neither a stone nor an empty cell
+
+    def __init__(self, size: int):
+        """
+        Initialize the evaluator for one board size.
+
+        Args:
+            size: The size of the boards (size x size)
+        """
+        self.size = size
+        # Flat cell index of every line cell, padded with the index of an extra
+        # off-board cell so all lines have length size + 2 (one pad at each end)
+        off_board = size * size
+        lines = [line for family in PatternEvaluator(size).lines for line in family]
+        self.line_index = np.full((len(lines), size + 2), off_board, dtype=np.intp)
+        for i, line in enumerate(lines):
+            self.line_index[i, 1:len(line) + 1] = [r * size + c for r, c in line]
+        # Score of a run by length and number of open ends
+        self.run_scores = np.array([[k * pattern_score(k, ends) for ends in range(3)]
+                                    for k in range(size + 1)])
+
+    def scores(self, boards) -> np.ndarray:
+        """
+        Score a stack of boards from player 1's point of view.
+
+        Args:
+            boards: Array of shape (N, size, size) with 0 for empty cells and
+                    1 or 2 for stones
+
+        Returns:
+            Array of N scores, each equal to PatternEvaluator.score of the board
+        """
+        boards = np.asarray(boards)
+        n = boards.shape[0]
+        cells = np.full((n, self.size * self.size + 1), self.OFF_BOARD, dtype=np.int8)
+        cells[:, :-1] = boards.reshape(n, -1)
+        lines = cells[:, self.line_index]  # (N, lines, size + 2)
+        empty = lines == 0
+
+        total = np.zeros(n, dtype=np.int64)
+        for player, sign in ((1, 1), (2, -1)):
+            stones = lines == player
+            length = stones.shape[-1]
+            run = stones  # run[..., j]: the k cells starting at j are all stones
+            for k in range(1, self.size + 1):
+                if k > 1:
+                    run = run[..., :-1] & stones[..., k - 1:]
+                if not run.any():
+                    break
+                # Runs of exactly k stones start at j with no stone at j - 1 or j + k
+                exact = (run[..., 1:length - k] & ~stones[..., :length - k - 1]
+                         & ~stones[..., k + 1:])
+                open_ends = (empty[..., :length - k - 1].astype(np.int8)
+                             + empty[..., k + 1:])
+                run_scores = self.run_scores[k][open_ends]
+                total += sign * (run_scores * exact).sum(axis=(1, 2))
+        return total
+
+
+def move_score(grid, size: int, row: int, col: int, player: int) -> int:
+    """
+    Score the patterns a player would make by placing a stone on an empty cell.
+
+    This is GomokuAI.evaluate_pattern summed over the four directions, as if
+    the stone were already on the board, so a result of 10000 or more means
+    the move completes five in a row.
+
+    Args:
+        grid: The board's cells as nested lists (grid[row][col])
+        size: The size of the board
+        row, col: The empty cell
+        player: Player placing the stone (1 or 2)
+
+    Returns:
+        Pattern score of the lines through the cell
+    """
+    total = 0
+    for dr, dc in DIRECTIONS:
+        consecutive = 1
+        open_ends = 0
+        for sign in (1, -1):
+            r, c = row + sign * dr, col + sign * dc
+            while 0 <= r < size and 0 <= c < size and grid[r][c] == player:
+                consecutive += 1
+                r, c = r + sign * dr, c + sign * dc
+            if 0 <= r < size and 0 <= c < size and grid[r][c] == 0:
+                open_ends += 1
+        total += pattern_score(consecutive, open_ends)
+    return total
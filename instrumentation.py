@@ -0,0 +1,153 @@
+import time
+
+# Events a GomokuAI fires hooks for during get_move
+SEARCH_EVENTS = ("start", "iteration", "finish")
+
+# Parts of the search the profiler times
+TIMED_SECTIONS = ("evaluate", "move_generation", "terminal_check")
+
+
+class SearchProfiler:
+    """
+    Counts and times the parts of a GomokuAI search.
+
+    attach shadows the AI's search methods with instance attributes that
+    count and time every call, so an AI without a profiler runs its plain
+    methods and pays nothing for the instrumentation.
+    """
+
+    # GomokuAI methods replaced by counting wrappers while attached
+    WRAPPED_METHODS = ("minimax", "alpha_beta", "pvs", "evaluate", "batch_leaf_scores",
+                       "is_terminal", "generate_moves", "order_moves")
+
+    def __init__(self):
+        """Initialize the profiler with empty statistics."""
+        self.reset()
+
+    def reset(self):
+        """Clear the statistics before a new search."""
+        self.nodes_per_depth = {}  # Ply below the root -> nodes searched there
+        self.leaf_evaluations = 0
+        self.terminal_hits = 0
+        self.times = dict.fromkeys(TIMED_SECTIONS, 0.0)
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the current search.
+
+        Returns:
+            Dictionary with nodes per ply, leaf evaluations, terminal hits and
+            the seconds spent in each timed section
+        """
+        return {
+            "nodes_per_depth": dict(sorted(self.nodes_per_depth.items())),
+            "leaf_evaluations": self.leaf_evaluations,
+            "terminal_hits": self.terminal_hits,
+            "time_evaluate": self.times["evaluate"],
+            "time_move_generation": self.times["move_generation"],
+            "time_terminal_check": self.times["terminal_check"],
+        }
+
+    def attach(self, ai):
+        """
+        Instrument an AI's search methods.
+
+        Args:
+            ai: The GomokuAI to profile
+        """
+        perf_counter = time.perf_counter
+
+        def counted(search):
+            def wrapper(board, depth, *args):
+                ply = len(board.move_stack) - ai.root_ply
+                self.nodes_per_depth[ply] = self.nodes_per_depth.get(ply, 0) + 1
+                return search(board, depth, *args)
+            return wrapper
+
+        def timed(method, section):
+            def wrapper(*args):
+                start = perf_counter()
+                result = method(*args)
+                self.times[section] += perf_counter() - start
+                return result
+            return wrapper
+
+        evaluate = timed(ai.evaluate, "evaluate")
+        batch_leaf_scores = timed(ai.batch_leaf_scores, "evaluate")
+        is_terminal = timed(ai.is_terminal, "terminal_check")
+
+        def counted_evaluate(board):
+            self.leaf_evaluations += 1
+            return evaluate(board)
+
+        def counted_batch_leaf_scores(board, moves, player):
+            self.leaf_evaluations += len(moves)
+            return batch_leaf_scores(board, moves, player)
+
+        def counted_is_terminal(board):
+            terminal = is_terminal(board)
+            if terminal:
+                self.terminal_hits += 1
+            return terminal
+
+        ai.minimax = counted(ai.minimax)
+        ai.alpha_beta = counted(ai.alpha_beta)
+        ai.pvs = counted(ai.pvs)
+        ai.evaluate = counted_evaluate
+        ai.batch_leaf_scores = counted_batch_leaf_scores
+        ai.is_terminal = counted_is_terminal
+        ai.generate_moves = timed(ai.generate_moves, "move_generation")
+        ai.order_moves = timed(ai.order_moves, "move_generation")
+
+    def detach(self, ai):
+        """
+        Restore an AI's plain search methods.
+
+        Args:
+            ai: The GomokuAI the profiler is attached to
+        """
+        for name in self.WRAPPED_METHODS:
+            ai.__dict__.pop(name, None)
+
+
+def print_search_stats(ai, info: dict):
+    """
+    Print the chosen move and search statistics (the "finish" hook of a verbose AI).
+
+    Args:
+        ai: The GomokuAI that searched
+        info: Statistics passed to the finish hook
+    """
+    print(f"AI {ai.algorithm} (player {ai.player}) chose move {info['move']}")
+    if info["book_move"]:
+        print("Move taken from the opening book")
+    if info["forced_line"]:
+        print(f"Forced win found by threat search: {info['forced_line']}")
+    print(f"Nodes evaluated: {info['nodes']}, Depth: {info['depth']}, "
+          f"Time: {info['time']:.2f}s")
+    if ai.tt and ai.algorithm != "mcts":
+        print(f"TT hits: {info['tt_hits']}, misses: {info['tt_misses']}, "
+              f"collisions: {info['tt_collisions']}")
+    if info["workers"] > 1:
+        print(f"Workers: {info['workers']}, "
+              f"Busy on average: {info['worker_utilization']:.2f}")
+        if info["parallel_speedup"] is not None:
+            print(f"Speedup over one worker (time to depth): {info['parallel_speedup']:.2f}x")
+    if info["principal_variation"]:
+        print(f"Principal variation: {info['principal_variation']}")
+    if info["win_rate"] is not None:
+        print(f"Playout win rate of the move: {info['win_rate']:.1%}")
+    if ai.algorithm in ("alphabeta", "pvs"):
+        print(f"Cutoff rate: {info['cutoff_rate']:.1%}, "
+              f"Effective branching factor: {info['effective_branching_factor']:.2f}")
+        if info["extended"] or info["reduced"]:
+            print(f"Extended moves: {info['extended']}, Reduced moves: {info['reduced']}, "
+                  f"Re-searched: {info['researched']}")
+    profile = info.get("profile")
+    if profile:
+        print(f"Leaf evaluations: {profile['leaf_evaluations']}, "
+              f"Terminal hits: {profile['terminal_hits']}, "
+              f"Nodes per depth: {list(profile['nodes_per_depth'].values())}")
+        print(f"Time in evaluate: {profile['time_evaluate']:.3f}s, "
+              f"move generation: {profile['time_move_generation']:.3f}s, "
+              f"terminal checks: {profile['time_terminal_check']:.3f}s")
@@ -7,6 +7,9 @@ from board import GomokuBoard
 from player import GomokuAI
 from Controller import GomokuGame
 
+# Menu choices of the search algorithm
+ALGORITHMS = {1: "minimax", 2: "alphabeta", 3: "pvs", 4: "mcts"}
+
 def main():
     """Main function to run the Gomoku game."""
     print("Welcome to Gomoku!")
@@ -25,35 +28,44 @@ def main():
             print("AI Algorithm options:")
             print("1. Minimax")
             print("2. Alpha-Beta Pruning")
+            print("3. Principal Variation Search")
+            print("4. Monte Carlo Tree Search")
             
-            ai_algo_choice = int(input("Choose AI algorithm (1 or 2): "))
-            ai_algorithm = "minimax" if ai_algo_choice == 1 else "alphabeta"
+            ai_algo_choice = int(input("Choose AI algorithm (1-4): "))
+            ai_algorithm = ALGORITHMS.get(ai_algo_choice, "alphabeta")
             
             ai_depth = int(input("Enter AI search depth (2 recommended): "))
+            ai_time_limit = float(input("Enter AI time limit per move in seconds (0 for fixed depth): "))
             ai_player = int(input("AI plays as player (1 or 2): "))
             
-            game.human_vs_ai(ai_algorithm, ai_depth, ai_player)
+            game.human_vs_ai(ai_algorithm, ai_depth, ai_player, ai_time_limit or None)
             
         elif mode == 2:  # AI vs AI
             print("AI1 (Player 1) Algorithm options:")
             print("1. Minimax")
             print("2. Alpha-Beta Pruning")
+            print("3. Principal Variation Search")
+            print("4. Monte Carlo Tree Search")
             
-            ai1_algo_choice = int(input("Choose AI1 algorithm (1 or 2): "))
-            ai1_algorithm = "minimax" if ai1_algo_choice == 1 else "alphabeta"
+            ai1_algo_choice = int(input("Choose AI1 algorithm (1-4): "))
+            ai1_algorithm = ALGORITHMS.get(ai1_algo_choice, "alphabeta")
             ai1_depth = int(input("Enter AI1 search depth (2 recommended): "))
             
             print("AI2 (Player 2) Algorithm options:")
             print("1. Minimax")
             print("2. Alpha-Beta Pruning")
+            print("3. Principal Variation Search")
+            print("4. Monte Carlo Tree Search")
             
-            ai2_algo_choice = int(input("Choose AI2 algorithm (1 or 2): "))
-            ai2_algorithm = "minimax" if ai2_algo_choice == 1 else "alphabeta"
+            ai2_algo_choice = int(input("Choose AI2 algorithm (1-4): "))
+            ai2_algorithm = ALGORITHMS.get(ai2_algo_choice, "alphabeta")
             ai2_depth = int(input("Enter AI2 search depth (2 recommended): "))
             
             max_moves = int(input("Enter maximum number of moves (100 recommended): "))
+            time_limit = float(input("Enter AI time limit per move in seconds (0 for fixed depth): "))
             
-            game.ai_vs_ai(ai1_algorithm, ai2_algorithm, ai1_depth, ai2_depth, max_moves)
+            game.ai_vs_ai(ai1_algorithm, ai2_algorithm, ai1_depth, ai2_depth, max_moves,
+                          time_limit or None)
             
         else:
             print("Invalid mode selected.")
@@ -0,0 +1,373 @@
+import math
+import random
+import threading
+import time
+from typing import Tuple, List, Optional
+from board import GomokuBoard
+from evaluator import WIN_SCORE
+
+# Score (player 1's point of view) at which an unfinished rollout counts as
+# a 73% win, i.e. the scale of the logistic curve that maps scores to results
+ROLLOUT_SCALE = 1000
+
+OPEN_FOUR_SCORE = 5000  # move_score of a move that makes an open four (a win next move)
+FOUR_SCORE = 500  # move_score of a move that makes a four (a threat to win next move)
+
+
+class MCTSNode:
+    """A position in the Monte Carlo search tree, reached by one move."""
+
+    __slots__ = ("move", "parent", "player", "children", "untried", "visits", "wins")
+
+    def __init__(self, move: Optional[Tuple[int, int]], parent: Optional['MCTSNode'], player: int):
+        """
+        Initialize an unvisited node.
+
+        Args:
+            move: The move leading to the node (None for the root)
+            parent: The node the move was played from (None for the root)
+            player: Player who made the move
+        """
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.children = []
+        self.untried = []  # Moves not expanded yet, the most promising last
+        self.visits = 0
+        self.wins = 0.0  # Sum of playout results for player
+
+    def win_rate(self) -> float:
+        """Average playout result for the player who made the move."""
+        return self.wins / self.visits if self.visits else 0.0
+
+
+class MCTS:
+    """
+    Monte Carlo Tree Search with UCT selection and pattern-guided rollouts.
+
+    Every playout walks down the tree by the UCT formula, adds one node,
+    and finishes the game with a fast rollout. All moves are played on the
+    caller's board with push and taken back with pop, so no board is copied.
+    With progressive widening a node only considers its k best moves by
+    pattern score, where k grows with the square root of its visits, so the
+    playouts go to the frontier moves that matter instead of spreading over
+    every neighbor cell.
+    """
+
+    def __init__(self, exploration: float = 1.0, progressive_widening: bool = True,
+                 widening_base: float = 2.0, rollout_depth: int = 20, rollout_sample: int = 8,
+                 seed: Optional[int] = None):
+        """
+        Initialize the search.
+
+        Args:
+            exploration: UCT exploration constant
+            progressive_widening: Whether to limit the children of a node by its visits
+            widening_base: Children allowed at one visit; the limit is
+                           widening_base * sqrt(visits)
+            rollout_depth: Moves a rollout plays before it is scored by the evaluator
+            rollout_sample: Random candidate cells a rollout move is chosen among,
+                            besides the cells around the last move
+            seed: Seed of the random number generator (None for a random seed)
+        """
+        self.exploration = exploration
+        self.progressive_widening = progressive_widening
+        self.widening_base = widening_base
+        self.rollout_depth = rollout_depth
+        self.rollout_sample = rollout_sample
+        self.random = random.Random(seed)
+        self.playouts = 0
+        self.tree_depth = 0  # Deepest node of the tree below the root
+        self.root = None
+        self.root_moves = []  # Move stack of the root position
+
+    def search(self, board: GomokuBoard, playouts: Optional[int] = None,
+               deadline: Optional[float] = None, reuse: bool = False,
+               stop: Optional[threading.Event] = None) -> MCTSNode:
+        """
+        Grow a search tree from a position.
+
+        Args:
+            board: The position (left unchanged)
+            playouts: Number of playouts to run (None runs until the deadline)
+            deadline: Wall-clock time at which the search stops, if any
+            reuse: Whether to continue from the subtree of the position in the
+                   tree of the previous search, if it is there
+            stop: Event that ends the search when set from another thread
+
+        Returns:
+            The root node of the tree
+        """
+        if playouts is None and deadline is None:
+            raise ValueError("MCTS needs a playout budget or a deadline")
+        self.playouts = 0
+        self.tree_depth = 0
+        root = self.subtree(board) if reuse else None
+        if root is None:
+            root = MCTSNode(None, None, 3 - board.current_player)
+            root.untried = self.candidate_moves(board)
+        self.root = root
+        self.root_moves = list(board.move_stack)
+
+        while playouts is None or self.playouts < playouts:
+            # Check the clock every few playouts; one playout is a fraction of a millisecond
+            if self.playouts % 16 == 0 and (
+                    (deadline is not None and time.time() >= deadline)
+                    or (stop is not None and stop.is_set())):
+                break
+            self.playout(board)
+        return self.root
+
+    def subtree(self, board: GomokuBoard) -> Optional[MCTSNode]:
+        """
+        Find a position in the tree of the previous search.
+
+        Args:
+            board: The position, reached by playing on from the previous root
+
+        Returns:
+            The position's node, detached from its parent, or None if the
+            moves since the previous root were not in the tree
+        """
+        played = board.move_stack
+        if self.root is None or played[:len(self.root_moves)] != self.root_moves:
+            return None
+        node = self.root
+        for move in played[len(self.root_moves):]:
+            node = next((child for child in node.children if child.move == move), None)
+            if node is None:
+                return None
+        node.parent = None  # Backpropagation stops at the new root
+        return node
+
+    def best_move(self) -> Optional[Tuple[int, int]]:
+        """Get the most visited move of the root, or its best untried move without playouts."""
+        if self.root.children:
+            return max(self.root.children, key=lambda child: child.visits).move
+        return self.root.untried[-1] if self.root.untried else None
+
+    def root_stats(self) -> List[Tuple[Tuple[int, int], int, float]]:
+        """
+        Get the visits and results of the root moves.
+
+        Returns:
+            List of (move, visits, wins) for every expanded root move
+        """
+        return [(child.move, child.visits, child.wins) for child in self.root.children]
+
+    def principal_variation(self) -> List[Tuple[int, int]]:
+        """Get the line of most visited moves from the root."""
+        line = []
+        node = self.root
+        while node.children:
+            node = max(node.children, key=lambda child: child.visits)
+            line.append(node.move)
+        return line
+
+    def playout(self, board: GomokuBoard):
+        """
+        Run one selection, expansion, rollout and backpropagation step.
+
+        Args:
+            board: The position of the root (restored before returning)
+        """
+        node = self.root
+        depth = 0
+
+        # Selection and expansion
+        while not board.game_over:
+            if node.untried and len(node.children) < self.child_limit(node):
+                move = node.untried.pop()
+                player = board.current_player
+                board.push(move)
+                depth += 1
+                child = MCTSNode(move, node, player)
+                if not board.game_over:
+                    child.untried = self.candidate_moves(board)
+                node.children.append(child)
+                node = child
+                break
+            if not node.children:
+                break  # No moves left to play
+            node = self.select(node)
+            board.push(node.move)
+            depth += 1
+        self.tree_depth = max(self.tree_depth, depth)
+
+        result = self.rollout(board)  # From player 1's point of view
+        for _ in range(depth):
+            board.pop()
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            node.wins += result if node.player == 1 else 1 - result
+            node = node.parent
+        self.playouts += 1
+
+    def child_limit(self, node: MCTSNode) -> float:
+        """Get the number of children a node may have at its current visit count."""
+        if not self.progressive_widening:
+            return float('inf')
+        return self.widening_base * math.sqrt(node.visits + 1)
+
+    def select(self, node: MCTSNode) -> MCTSNode:
+        """
+        Pick the child to descend into by the UCT formula.
+
+        Args:
+            node: A node with expanded children
+
+        Returns:
+            The child with the highest upper confidence bound
+        """
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best_value = float('-inf')
+        best_child = None
+        for child in node.children:
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best_child = child
+        return best_child
+
+    def candidate_moves(self, board: GomokuBoard) -> List[Tuple[int, int]]:
+        """
+        Get the moves of a new node, sorted by pattern score.
+
+        A winning move is the only move considered, and if the opponent
+        threatens to win the only moves are the ones that block it. If the
+        opponent threatens an open four, the moves are the ones that stop it
+        and the fours that gain a tempo.
+
+        Args:
+            board: The position of the node
+
+        Returns:
+            The moves, the most promising last (expanded first)
+        """
+        player = board.current_player
+        opponent = 3 - player
+        move_score = board.evaluator.move_score
+        keyed = []
+        blocks = []
+        open_three = False  # Whether the opponent can make an open four
+        for move in board.get_neighbor_moves(board.candidate_distance):
+            attack = move_score(move[0], move[1], player)
+            if attack >= WIN_SCORE:
+                return [move]
+            defense = move_score(move[0], move[1], opponent)
+            if defense >= WIN_SCORE:
+                blocks.append(move)
+            elif defense >= OPEN_FOUR_SCORE:
+                open_three = True
+            keyed.append((attack + defense, attack, defense, move))
+        if blocks:
+            return blocks
+        if open_three:
+            keyed = [key for key in keyed if key[1] >= FOUR_SCORE or key[2] >= OPEN_FOUR_SCORE]
+        keyed.sort()
+        return [key[-1] for key in keyed]
+
+    def rollout(self, board: GomokuBoard) -> float:
+        """
+        Play a game out from a position with the rollout policy.
+
+        Args:
+            board: The position (restored before returning)
+
+        Returns:
+            1 if player 1 wins, 0 if player 2 wins, 0.5 for a draw; a rollout
+            cut off at rollout_depth scores the position with the evaluator
+        """
+        played = 0
+        while not board.game_over and played < self.rollout_depth:
+            board.push(self.rollout_move(board))
+            played += 1
+
+        if board.game_over:
+            result = 0.5 if board.winner is None else float(board.winner == 1)
+        else:
+            result = 1 / (1 + math.exp(-board.evaluator.score / ROLLOUT_SCALE))
+        for _ in range(played):
+            board.pop()
+        return result
+
+    def rollout_move(self, board: GomokuBoard) -> Tuple[int, int]:
+        """
+        Choose a rollout move from the cells around the last two moves and a random sample.
+
+        Forcing moves are played by urgency: a win, a block of a win, an open
+        four, a block of an open four. Otherwise moves are drawn with
+        probability proportional to their pattern score, so threats are
+        likely but the rollouts still vary.
+
+        Args:
+            board: The position
+
+        Returns:
+            The move to play
+        """
+        candidates = board.candidates
+        if not candidates:
+            return board.get_neighbor_moves(board.candidate_distance)[0]
+        player = board.current_player
+        opponent = 3 - player
+        move_score = board.evaluator.move_score
+
+        # Threats come up next to the stones just played
+        cells = {}
+        for row, col in board.move_stack[-2:]:
+            for cell in board.neighborhoods[row * board.size + col]:
+                if cell in candidates:
+                    cells[cell] = None
+        pool = tuple(candidates)
+        cells.update(dict.fromkeys(self.random.sample(pool, min(self.rollout_sample, len(pool)))))
+        cells = list(cells)
+
+        weights = []
+        best_urgency = 0
+        forced = None
+        for row, col in cells:
+            attack = move_score(row, col, player)
+            defense = move_score(row, col, opponent)
+            if attack >= WIN_SCORE:
+                return (row, col)
+            urgency = (3 if defense >= WIN_SCORE else 2 if attack >= OPEN_FOUR_SCORE
+                       else 1 if defense >= OPEN_FOUR_SCORE else 0)
+            if urgency > best_urgency:
+                best_urgency = urgency
+                forced = (row, col)
+            weights.append(attack + defense + 1)
+        if forced is not None:
+            return forced
+        return self.random.choices(cells, weights)[0]
+
+
+def run_mcts(board: GomokuBoard, playouts: Optional[int], deadline: Optional[float],
+             seed: int, progressive_widening: bool = True, stop=None) -> dict:
+    """
+    Grow an independent tree in a worker process (root parallelization).
+
+    Args:
+        board: The position to search
+        playouts: Number of playouts (None runs until the deadline)
+        deadline: Wall-clock time at which the search stops, if any
+        seed: Seed of the worker's random number generator
+        progressive_widening: Whether the tree uses progressive widening
+        stop: Event shared with the parent process that ends the search when set
+
+    Returns:
+        Dictionary with the (move, visits, wins) of the root moves, the number
+        of playouts, the depth of the tree and the CPU time spent
+    """
+    start_time = time.process_time()
+    mcts = MCTS(progressive_widening=progressive_widening, seed=seed)
+    mcts.search(board, playouts, deadline, stop=stop)
+    return {
+        "children": mcts.root_stats(),
+        "playouts": mcts.playouts,
+        "tree_depth": mcts.tree_depth,
+        "time": time.process_time() - start_time,
+    }
@@ -0,0 +1,190 @@
+import argparse
+import json
+import struct
+import numpy as np
+from typing import Tuple, List, Optional
+from board import GomokuBoard
+from symmetry import canonical_hash, transform, inverse
+from records import is_record_file, read_records, replay
+
+# File layout: header, then one record per (position, move), sorted by key
+MAGIC = b"GMKBOOK1"
+HEADER = struct.Struct("<8sIII")  # Magic, board size, maximum stones, record count
+RECORD = np.dtype([
+    ("key", "<u8"),     # Canonical Zobrist hash of the position
+    ("row", "u1"),      # Move in the canonical orientation
+    ("col", "u1"),
+    ("games", "<u4"),   # Games in which the move was played
+    ("points", "<u4"),  # Score of the player who made the move, in half points
+])
+# Games a book move needs before it is kept and played: the average result of
+# a move seen in one or two games is mostly noise, so such moves are left to
+# the search
+MIN_BOOK_GAMES = 10
+
+
+class OpeningBook:
+    """
+    Memory-mapped opening book of move statistics.
+
+    The records are sorted by position key and read through a memory map,
+    so a lookup is a binary search that only touches the pages it needs.
+    Positions are stored once for all 8 board symmetries.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a book file written by write_book.
+
+        Args:
+            path: Path of the book file
+        """
+        with open(path, "rb") as f:
+            magic, self.size, self.max_stones, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not an opening book: {path}")
+        self.path = path
+        if count:
+            self.records = np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD)
+        self.keys = self.records["key"]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def lookup(self, board: GomokuBoard) -> List[Tuple[Tuple[int, int], int, float]]:
+        """
+        Get the book moves of a position.
+
+        Args:
+            board: The position
+
+        Returns:
+            List of (move, games, score) in the board's orientation, where score
+            is the average result (0 to 1) for the player who made the move
+        """
+        if board.size != self.size or board.stone_count > self.max_stones:
+            return []
+        key, symmetry = canonical_hash(board)
+        start = np.searchsorted(self.keys, np.uint64(key), side="left")
+        end = np.searchsorted(self.keys, np.uint64(key), side="right")
+
+        undo = inverse(symmetry)
+        moves = []
+        for record in self.records[start:end]:
+            move = transform(int(record["row"]), int(record["col"]), undo, self.size)
+            games = int(record["games"])
+            moves.append((move, games, int(record["points"]) / (2 * games)))
+        return moves
+
+    def choose(self, board: GomokuBoard,
+               min_games: int = MIN_BOOK_GAMES) -> Optional[Tuple[int, int]]:
+        """
+        Pick the book move with the best average result.
+
+        Args:
+            board: The position
+            min_games: Fewest games a move needs to be considered
+
+        Returns:
+            The move, or None if the position has no book move with enough games
+        """
+        best = None
+        for move, games, score in self.lookup(board):
+            # Hash collisions could suggest an occupied cell
+            if games < min_games or not board.is_valid_move(*move):
+                continue
+            if best is None or (score, games) > best[0]:
+                best = ((score, games), move)
+        return best[1] if best else None
+
+
+def write_book(path: str, stats: dict, size: int, max_stones: int):
+    """
+    Write move statistics as a book file.
+
+    Args:
+        path: Path of the book file
+        stats: (key, row, col) -> [games, points] in the canonical orientation
+        size: The board size of the positions
+        max_stones: Largest number of stones of a book position
+    """
+    records = np.zeros(len(stats), dtype=RECORD)
+    for i, ((key, row, col), (games, points)) in enumerate(sorted(stats.items())):
+        records[i] = (key, row, col, games, points)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, max_stones, len(records)))
+        f.write(records.tobytes())
+
+
+def read_games(path: str):
+    """
+    Read the games of a tournament log, either JSONL or a binary record file.
+
+    Args:
+        path: Path of the log
+
+    Yields:
+        Game records with at least "size", "moves" and "result"
+    """
+    if is_record_file(path):
+        yield from read_records(path)
+        return
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def build_book(game_files: List[str], path: str, size: int = 15, max_plies: int = 12,
+               min_games: int = MIN_BOOK_GAMES) -> int:
+    """
+    Build a book from tournament game logs (JSONL or binary record files).
+
+    Args:
+        game_files: Game logs written by tournament.py
+        path: Path of the book file to write
+        size: Board size; games on other boards are skipped
+        max_plies: Number of moves of each game that go into the book
+        min_games: Fewest games a (position, move) pair needs to be kept
+
+    Returns:
+        Number of records written
+    """
+    points_for_mover = {"1-0": (2, 0), "0-1": (0, 2), "1/2-1/2": (1, 1)}
+    stats = {}
+    for game_file in game_files:
+        for game in read_games(game_file):
+            if game["size"] != size or game["result"] not in points_for_mover:
+                continue
+            for board, (row, col) in replay(game, max_plies):
+                key, symmetry = canonical_hash(board)
+                canonical_row, canonical_col = transform(row, col, symmetry, size)
+                entry = stats.setdefault((key, canonical_row, canonical_col), [0, 0])
+                entry[0] += 1
+                entry[1] += points_for_mover[game["result"]][board.current_player - 1]
+
+    stats = {k: v for k, v in stats.items() if v[0] >= min_games}
+    write_book(path, stats, size, max_plies - 1)
+    return len(stats)
+
+
+def main():
+    """Build an opening book from the command line."""
+    parser = argparse.ArgumentParser(description="Build a Gomoku opening book from game logs.")
+    parser.add_argument("games", nargs="+",
+                        help="Game logs written by tournament.py (JSONL or binary records)")
+    parser.add_argument("--output", required=True, help="Path of the book file")
+    parser.add_argument("--size", type=int, default=15, help="Board size")
+    parser.add_argument("--plies", type=int, default=12, help="Moves of each game added to the book")
+    parser.add_argument("--min-games", type=int, default=MIN_BOOK_GAMES,
+                        help="Fewest games a move needs to be kept")
+    args = parser.parse_args()
+
+    count = build_book(args.games, args.output, args.size, args.plies, args.min_games)
+    print(f"Wrote {count} book moves to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
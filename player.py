@@ -2,93 +2,937 @@ import numpy as np
 import time
 import pygame
 import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import Tuple, List, Optional
-from board import GomokuBoard
+from board import GomokuBoard, neighborhoods
+from evaluator import pattern_score, BatchEvaluator, WIN_SCORE, THREAT_SCORE
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from threat_solver import ThreatSolver
+from mcts import MCTS, run_mcts
+from opening_book import OpeningBook
+from symmetry import canonical_hash, symmetry_group, unique_moves, transform_move, inverse
+from instrumentation import SearchProfiler, SEARCH_EVENTS, print_search_stats
+
+ASPIRATION_WINDOW = 50  # Half-width of the PVS root window around the previous iteration's score
+TT_MAX_AGE = 4  # Searches a persistent AI keeps a transposition table entry that is not stored again
+# Batched leaf evaluation scores a square window around the stones instead of
+# the whole board. Runs are scored by the cells just past their ends, so one
+# cell of margin keeps the scores exact; window sizes are rounded up to a
+# multiple of BATCH_WINDOW_STEP so only a few evaluators are ever built
+BATCH_MARGIN = 1
+BATCH_WINDOW_STEP = 8
+LMR_MIN_DEPTH = 2  # Remaining depth from which quiet late moves are reduced
+LMR_REDUCTION = 1  # Plies taken off the search of a reduced move
+# Shallowest root search split across worker processes; shallower ones take
+# less time than handing the moves to the workers
+PARALLEL_MIN_DEPTH = 1
+# Score of a game won in the search, less the plies it took. Far above any sum
+# of pattern scores, so only a finished game scores MATE_BOUND or more
+MATE_SCORE = 10000000
+MATE_BOUND = MATE_SCORE // 2
 
 class GomokuAI:
-    """AI player for Gomoku using Minimax and Alpha-Beta pruning algorithms."""
+    """AI player for Gomoku using Minimax, Alpha-Beta pruning, Principal Variation Search or MCTS."""
     
-    def __init__(self, player_number: int, algorithm: str = "minimax", max_depth: int = 3):
+    def __init__(self, player_number: int, algorithm: str = "minimax", max_depth: int = 3,
+                 tt_size: int = 1 << 18, tt_replacement: str = "depth",
+                 time_limit: Optional[float] = None, move_ordering: bool = True,
+                 threat_search: bool = True, threat_nodes: int = 1000, workers: int = 1,
+                 verbose: bool = True, profile: bool = False, batch_leaves: bool = False,
+                 book: Optional[str] = None, playouts: int = 1000,
+                 progressive_widening: bool = True, persistent: bool = False,
+                 symmetry_plies: int = 0, canonical_stones: int = 0, extensions: int = 0,
+                 reduction_moves: int = 0, narrow_ply: Optional[int] = None,
+                 measure_speedup: bool = False):
         """
         Initialize the AI player.
         
         Args:
             player_number: 1 for the first player, 2 for the second player
-            algorithm: "minimax" or "alphabeta" - the search algorithm to use
+            algorithm: "minimax", "alphabeta", "pvs" or "mcts" - the search algorithm to use
             max_depth: Maximum search depth for the algorithm
+            tt_size: Number of transposition table slots (0 disables the table)
+            tt_replacement: Transposition table replacement policy ("always" or "depth")
+            time_limit: Default time budget per move in seconds; when set, the search
+                        deepens iteratively instead of searching to max_depth
+            move_ordering: Whether alpha-beta and PVS sort moves by threats, killers and history
+            threat_search: Whether to look for a forced VCF/VCT win before searching
+            threat_nodes: Node budget of the forced-win search per move
+            workers: Number of processes the root moves are split across (1 searches
+                     in this process, deterministically)
+            verbose: Whether get_move prints the chosen move and search statistics
+            profile: Whether to count and time the parts of every search (see
+                     SearchProfiler); without it the search runs uninstrumented
+            batch_leaves: Whether nodes one ply above the leaves score all their
+                          children in one vectorized BatchEvaluator call
+                          (minimax, and alpha-beta nodes whose window cannot
+                          prune; PVS always searches its leaves one by one).
+                          It only pays off for wide, shallow searches
+            book: Path of an opening book file; positions found in it are
+                  answered with the book move instead of a search
+            playouts: Playouts per move of an MCTS search without a time limit
+                      (with one, MCTS plays out until the time is up)
+            progressive_widening: Whether MCTS nodes only consider their best
+                                  moves, more of them as they are visited
+            persistent: Whether to keep the transposition table, killer and
+                        history tables and MCTS tree from move to move (aged
+                        rather than cleared), which also allows pondering
+            symmetry_plies: Number of plies from the root at which moves that
+                            are symmetric to an earlier move in a symmetric
+                            position are skipped (0, the default, disables
+                            the pruning)
+            canonical_stones: Positions with fewer stones than this are stored
+                              in the transposition table under their canonical
+                              hash, so symmetric positions share one entry
+                              (0 always uses the plain hash)
+            extensions: Most plies one line of alpha-beta or PVS may be extended
+                        by, one per move that makes a four or an open three
+                        (0 disables extensions)
+            reduction_moves: Moves of an alpha-beta or PVS node searched at full
+                             depth; later quiet moves are searched LMR_REDUCTION
+                             plies shallower (one more after twice as many
+                             moves) with a null window and searched again at
+                             full depth only if they beat the best move
+                             (0 disables late-move reductions)
+            narrow_ply: Ply from which only moves next to a stone (distance 1)
+                        are searched, rather than all candidates within
+                        distance 2 (None searches all candidates at every ply)
+            measure_speedup: Whether every parallel search (workers > 1) is
+                             repeated with one worker to report its speedup
+                             in the search stats; this doubles the time a
+                             move takes
         """
         self.player = player_number
         self.opponent = 3 - player_number  # 1 if player is 2, 2 if player is 1
         self.algorithm = algorithm.lower()
         self.max_depth = max_depth
         self.nodes_evaluated = 0
+        self.root_ply = 0  # Length of the board's move stack at the search root
+        self.tt = TranspositionTable(tt_size, tt_replacement) if tt_size > 0 else None
+        self.time_limit = time_limit
+        self.deadline = None  # Wall-clock time at which a timed search stops
+        self.search_stopped = False
+        self.completed_depth = None  # Deepest fully searched iteration of the last move
+        self.move_ordering = move_ordering
+        self.killers = []  # Two most recent cutoff moves per ply
+        self.history = {}  # (player, move) -> history heuristic score
+        self.interior_nodes = 0  # Nodes whose moves were searched
+        self.pv_table = []  # Best line found below each ply of the current PVS search
+        self.principal_variation = []  # Best line of the last completed PVS iteration
+        self.aspiration_failures = 0  # PVS root windows the score fell outside of
+        self.cutoffs = 0
+        self.threat_solver = ThreatSolver(max_nodes=threat_nodes) if threat_search else None
+        self.forced_line = None  # Winning line found by the threat solver for the last move
+        self.forced_line_start = None  # Moves of the game before forced_line
+        self.tt_size = tt_size
+        self.tt_replacement = tt_replacement
+        self.workers = max(1, workers)
+        self.executor = None  # Process pool, created on the first parallel search
+        self.worker_stop = None  # Event that ends the workers' searches when set by stop
+        self.worker_bound = None  # Shared value: best root score found so far by any worker
+        self.measure_speedup = measure_speedup
+        self.parallel_speedup = None  # Time-to-depth speedup of the last search over one worker
+        self.iteration_times = []  # Time at which each iteration of the last search finished
+        self.worker_time = 0.0  # CPU time the workers spent searching
+        self.parallel_time = 0.0  # Wall-clock time of the parallel searches
+        self.verbose = verbose
+        self.batch_leaves = batch_leaves
+        self.book_path = book
+        self.book = OpeningBook(book) if book else None
+        self.book_move = None  # Move played from the opening book, if any
+        self.batch_evaluators = {}  # Window size -> BatchEvaluator, created on first use
+        self.playouts = playouts
+        self.progressive_widening = progressive_widening
+        self.win_rate = None  # MCTS estimate of the chosen move's winning chances
+        self.persistent = persistent
+        self.mcts = None  # Search tree kept between moves by a persistent MCTS AI
+        self.ponder_thread = None  # Background search during the opponent's turn
+        self.stop_event = threading.Event()  # Set by stop to end an MCTS search
+        self.ponder_move = None  # (position hash, depth, move) of the last pondering search
+        self.carried_over = False  # Whether ponder already aged the tables for the next move
+        self.symmetry_plies = symmetry_plies
+        self.canonical_stones = canonical_stones
+        self.extensions = extensions
+        self.reduction_moves = reduction_moves
+        self.narrow_ply = narrow_ply
+        self.extension_count = 0  # Extensions on the line being searched
+        self.extended = 0  # Moves extended in the last search
+        self.reduced = 0  # Moves searched at reduced depth in the last search
+        self.researched = 0  # Reduced moves searched again at full depth
+        self.hooks = {event: [] for event in SEARCH_EVENTS}  # Event -> callbacks
+        self.profiler = None
+        if profile:
+            self.profiler = SearchProfiler()
+            self.profiler.attach(self)
+        if verbose:
+            self.add_hook("finish", print_search_stats)
+    
+    def __getstate__(self):
+        # A process pool cannot be pickled; the copy creates its own when needed
+        state = self.__dict__.copy()
+        state["executor"] = None
+        state["worker_stop"] = None
+        state["worker_bound"] = None
+        state["book"] = None  # Reopened from book_path
+        # Threads cannot be pickled, and the copy does not need the search tree
+        state["ponder_thread"] = None
+        state["stop_event"] = None
+        state["mcts"] = None
+        # The profiler's wrappers are closures; the copy attaches its own
+        for name in SearchProfiler.WRAPPED_METHODS:
+            state.pop(name, None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.stop_event = threading.Event()
+        if self.book_path:
+            self.book = OpeningBook(self.book_path)
+        if self.profiler:
+            self.profiler.attach(self)
+    
+    def close(self):
+        """Stop pondering and shut down the worker processes of the parallel search."""
+        self.stop_pondering()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+            self.worker_stop = self.worker_bound = None
+    
+    def add_hook(self, event: str, callback):
+        """
+        Register a callback for a search event.
+        
+        Callbacks are called as callback(ai, info). On "start" info holds the
+        search limits; on "iteration" (after every completed search depth) and
+        "finish" (before get_move returns) it is the search_stats dictionary
+        plus the best move ("move") and the elapsed time in seconds ("time").
+        
+        Args:
+            event: "start", "iteration" or "finish"
+            callback: Function called with the AI and the event's info dictionary
+        """
+        if event not in self.hooks:
+            raise ValueError(f"Unknown search event: {event}")
+        self.hooks[event].append(callback)
+    
+    def remove_hook(self, event: str, callback):
+        """
+        Unregister a callback added with add_hook.
+        
+        Args:
+            event: "start", "iteration" or "finish"
+            callback: The registered callback
+        """
+        self.hooks[event].remove(callback)
+    
+    def fire_hooks(self, event: str, info: dict):
+        """Call the callbacks registered for a search event."""
+        for callback in self.hooks[event]:
+            callback(self, info)
+    
+    @property
+    def tt_hits(self) -> int:
+        """Transposition table probes that found the position."""
+        return self.tt.hits if self.tt else 0
     
-    def get_move(self, board: GomokuBoard) -> Tuple[int, int]:
+    @property
+    def tt_misses(self) -> int:
+        """Transposition table probes that found an empty slot."""
+        return self.tt.misses if self.tt else 0
+    
+    @property
+    def tt_collisions(self) -> int:
+        """Transposition table probes that found a different position in the slot."""
+        return self.tt.collisions if self.tt else 0
+    
+    def get_move(self, board: GomokuBoard, time_limit: Optional[float] = None) -> Tuple[int, int]:
         """
         Determine the best move for the AI player.
         
+        With a time limit the search deepens one ply at a time, trying the
+        previous iteration's best move first, and returns the best move of the
+        deepest iteration that finished within the budget. It stops early if
+        there is only one move or an iteration of depth 1 or more proves a
+        win or loss (a finished game is reached, scored near MATE_SCORE).
+        
         Args:
             board: The current game board
+            time_limit: Time budget in seconds (defaults to the AI's time_limit;
+                        None searches to max_depth without a budget)
             
         Returns:
             A tuple (row, col) representing the AI's chosen move
         """
-        self.nodes_evaluated = 0
+        if time_limit is None:
+            time_limit = self.time_limit
+        
+        self.stop_pondering()
+        ponder_move, self.ponder_move = self.ponder_move, None
+        forced_line, forced_line_start = self.forced_line, self.forced_line_start
+        if self.persistent and not self.carried_over:
+            self.carry_over(board)
+        self.carried_over = False
+        self.reset_search()
+        self.root_ply = len(board.move_stack)  # Root moves are generated at ply 0
         start_time = time.time()
+        self.fire_hooks("start", {
+            "max_depth": self.max_depth if time_limit is None else None,
+            "time_limit": time_limit,
+            "stones": board.stone_count,
+        })
         
         # Get potential moves (neighbors of existing stones)
-        possible_moves = board.get_neighbor_moves(2)
+        possible_moves = self.generate_moves(board)
         
         if not possible_moves:
             center = board.size // 2
+            self.fire_search_hooks("finish", (center, center), start_time)
             return (center, center)
         
+        # Known opening positions are played from the book without searching
+        if self.book:
+            self.book_move = self.book.choose(board)
+            if self.book_move:
+                self.fire_search_hooks("finish", self.book_move, start_time)
+                return self.book_move
+        
+        best_move = possible_moves[0]
+        
+        # A forced win found by threat-space search needs no full-width search.
+        # A line found for an earlier move is followed while the opponent's
+        # replies match it, so the win is not lost if the solver runs out of
+        # nodes on the way
+        if self.threat_solver:
+            self.forced_line = self.follow_forced_line(board, forced_line, forced_line_start)
+            if self.forced_line is None:
+                self.forced_line = self.threat_solver.solve(board, self.player)
+            self.forced_line_start = list(board.move_stack)
+        
+        search_start = time.time()
+        if self.forced_line:
+            best_move = self.forced_line[0]
+        elif self.algorithm == "mcts":
+            best_move = self.mcts_search(board, time_limit)
+            self.fire_search_hooks("iteration", best_move, start_time)
+        elif time_limit is None:
+            if ponder_move and ponder_move[:2] == (board.hash, self.max_depth):
+                # The opponent played the expected reply and pondering finished its search
+                best_move = ponder_move[2]
+            else:
+                best_move, _ = self.search_root(board, possible_moves, self.max_depth)
+                self.iteration_times.append(time.time() - search_start)
+            self.completed_depth = self.max_depth
+            self.fire_search_hooks("iteration", best_move, start_time)
+        else:
+            self.deadline = start_time + time_limit
+            # Deeper than the number of empty cells cannot change the result
+            max_depth = board.size * board.size - board.stone_count
+            scores = []  # Score of every completed iteration
+            for depth in range(max_depth):
+                if self.algorithm == "pvs" and scores:
+                    # Scores swing between odd and even depths, so the last
+                    # iteration of the same parity is the better guess
+                    guess = scores[-2] if len(scores) > 1 else scores[-1]
+                    move, score = self.aspiration_search(board, possible_moves, depth, guess)
+                else:
+                    move, score = self.search_root(board, possible_moves, depth)
+                if self.search_stopped:
+                    break  # Keep the result of the last completed iteration
+                best_move = move
+                scores.append(score)
+                self.completed_depth = depth
+                self.iteration_times.append(time.time() - search_start)
+                self.fire_search_hooks("iteration", best_move, start_time)
+                
+                # Deeper iterations cannot change a proven result or the only move
+                if len(possible_moves) == 1 or (depth >= 1 and abs(score) >= MATE_BOUND):
+                    break
+                
+                # Search the best move first in the next iteration
+                possible_moves.remove(move)
+                possible_moves.insert(0, move)
+            self.deadline = None
+        
+        if self.measure_speedup and self.workers > 1 and self.iteration_times:
+            self.parallel_speedup = self.serial_speedup(board, time_limit)
+        self.fire_search_hooks("finish", best_move, start_time)
+        
+        return best_move
+    
+    def serial_speedup(self, board: GomokuBoard, time_limit: Optional[float]) -> Optional[float]:
+        """
+        Measure the speedup of the last parallel search over one worker.
+        
+        A fresh AI with the same search options and one worker repeats the
+        search, and the times at which each finished its deepest iteration
+        that the other also finished are compared (time to depth).
+        
+        Args:
+            board: The position of the last search
+            time_limit: Time budget of the last search (None for fixed depth)
+            
+        Returns:
+            Serial time over parallel time to the same depth, or None if the
+            serial search finished no iteration
+        """
+        serial = GomokuAI(threat_search=False, verbose=False, **self.search_config())
+        serial.get_move(board.copy_board(), time_limit)
+        depth = min(len(serial.iteration_times), len(self.iteration_times)) - 1
+        if depth < 0 or self.iteration_times[depth] <= 0:
+            return None
+        return serial.iteration_times[depth] / self.iteration_times[depth]
+    
+    def follow_forced_line(self, board: GomokuBoard, line: Optional[List[Tuple[int, int]]],
+                           start: Optional[List[Tuple[int, int]]]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Get the rest of a forced win found earlier in the game, if the game followed it.
+        
+        Args:
+            board: The current game board
+            line: Forced line found by the threat solver for an earlier move
+            start: Moves of the game before the line
+            
+        Returns:
+            The remaining line from the current position, starting with the
+            AI's move, or None if the game left the line
+        """
+        if not line or start is None:
+            return None
+        moves = board.move_stack
+        played = moves[len(start):]
+        if (moves[:len(start)] != start or len(played) % 2 or len(played) >= len(line)
+                or played != line[:len(played)]):
+            return None
+        rest = line[len(played):]
+        return rest if board.is_valid_move(*rest[0]) else None
+    
+    def fire_search_hooks(self, event: str, best_move: Tuple[int, int], start_time: float):
+        """
+        Call the callbacks of an "iteration" or "finish" event with the search statistics.
+        
+        Args:
+            event: "iteration" or "finish"
+            best_move: Best move found so far
+            start_time: Wall-clock time at which the search started
+        """
+        if self.hooks[event]:
+            info = self.search_stats()
+            info["move"] = best_move
+            info["time"] = time.time() - start_time
+            self.fire_hooks(event, info)
+    
+    def reset_search(self):
+        """Reset the per-move search state and statistics (a persistent AI keeps its tables)."""
+        self.nodes_evaluated = 0
+        self.search_stopped = False
+        self.stop_event.clear()
+        if self.worker_stop is not None:
+            self.worker_stop.clear()
+        self.completed_depth = None
+        self.interior_nodes = 0
+        self.cutoffs = 0
+        self.pv_table = []
+        self.principal_variation = []
+        self.aspiration_failures = 0
+        self.extension_count = 0
+        self.extended = 0
+        self.reduced = 0
+        self.researched = 0
+        self.win_rate = None
+        self.forced_line = None
+        self.book_move = None
+        self.worker_time = 0.0
+        self.parallel_time = 0.0
+        self.parallel_speedup = None
+        self.iteration_times = []
+        if not self.persistent:
+            self.killers = []
+            self.history = {}
+            if self.tt:
+                self.tt.clear()
+        if self.profiler:
+            self.profiler.reset()
+    
+    def carry_over(self, board: GomokuBoard):
+        """
+        Age the tables of a persistent AI before searching a new position.
+        
+        Killer moves are shifted to the plies they belong to below the new
+        root, history scores are halved, and the transposition table starts
+        a new generation, evicting the entries of old searches.
+        
+        Args:
+            board: The position about to be searched
+        """
+        plies = len(board.move_stack) - self.root_ply  # Moves played since the last search
+        self.killers = self.killers[plies:] if plies >= 0 else []
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+        if self.tt:
+            self.tt.new_search(TT_MAX_AGE)
+    
+    def ponder(self, board: GomokuBoard):
+        """
+        Search in a background thread while the opponent thinks.
+        
+        Minimax-family AIs search the position after the opponent's expected
+        reply (the best move stored for it, or the best ordered move), which
+        fills the tables for the next get_move; if the reply is played and a
+        fixed-depth search finished, get_move returns its move at once. MCTS
+        keeps growing the current tree, whose subtree for the actual reply
+        the next search starts from. get_move stops the pondering.
+        
+        Args:
+            board: The current game board, with the opponent to move (not modified)
+        """
+        if not self.persistent:
+            raise ValueError("Only a persistent AI can ponder")
+        self.stop_pondering()
+        if board.game_over or board.current_player != self.opponent:
+            return
+        
+        board = board.copy_board()
+        if self.algorithm == "mcts":
+            target = self.ponder_tree
+        else:
+            reply = self.expected_reply(board)
+            board.push(reply)
+            if board.game_over:
+                return
+            target = self.ponder_search
+        # Aged once per move: get_move skips it after pondering
+        self.carry_over(board)
+        self.carried_over = True
+        self.reset_search()
+        self.ponder_thread = threading.Thread(target=target, args=(board,), daemon=True)
+        self.ponder_thread.start()
+    
+    def stop(self):
+        """
+        Stop the running search from another thread.
+        
+        get_move then returns the best move found so far: that of the last
+        completed iteration of a timed search, the best of the root moves
+        searched at a fixed depth, or the most visited MCTS move.
+        """
+        self.search_stopped = True
+        self.stop_event.set()
+        if self.worker_stop is not None:
+            self.worker_stop.set()
+    
+    def stop_pondering(self):
+        """Stop the pondering search, if any, and wait for its thread."""
+        if self.ponder_thread is None:
+            return
+        self.stop()
+        self.ponder_thread.join()
+        self.ponder_thread = None
+    
+    def expected_reply(self, board: GomokuBoard) -> Tuple[int, int]:
+        """
+        Guess the opponent's reply in a position.
+        
+        Args:
+            board: The current game board, with the opponent to move
+            
+        Returns:
+            The best move stored for the position, or else the best ordered move
+        """
+        key, symmetry = self.tt_key(board)
+        entry = self.tt.probe(key) if self.tt else None
+        if entry is not None and entry.best_move is not None:
+            move = transform_move(entry.best_move, inverse(symmetry), board.size)
+            if board.is_valid_move(*move):
+                return move
+        return self.order_moves(board, self.generate_moves(board), self.opponent)[0]
+    
+    def ponder_search(self, board: GomokuBoard):
+        """
+        Deepen the search of a position until pondering is stopped (runs in the ponder thread).
+        
+        Args:
+            board: The position after the expected reply (a copy owned by the thread)
+        """
+        self.root_ply = len(board.move_stack)
+        possible_moves = self.generate_moves(board)
+        if self.time_limit is None:
+            max_depth = self.max_depth
+        else:
+            max_depth = board.size * board.size - board.stone_count - 1
+        for depth in range(max_depth + 1):
+            move, score = self.search_root(board, possible_moves, depth)
+            if self.search_stopped:
+                break
+            self.ponder_move = (board.hash, depth, move)
+            if self.time_limit is not None and (len(possible_moves) == 1
+                                                or (depth >= 1 and abs(score) >= MATE_BOUND)):
+                break  # As in get_move, deeper iterations would not change the move
+            possible_moves.remove(move)
+            possible_moves.insert(0, move)
+    
+    def ponder_tree(self, board: GomokuBoard):
+        """
+        Grow the MCTS tree of a position until pondering is stopped (runs in the ponder thread).
+        
+        Args:
+            board: The current position (a copy owned by the thread)
+        """
+        if self.mcts is None:
+            self.mcts = MCTS(progressive_widening=self.progressive_widening,
+                             seed=len(board.move_stack))
+        self.mcts.search(board, None, float('inf'), reuse=True, stop=self.stop_event)
+    
+    def search_stats(self) -> dict:
+        """
+        Get statistics about the last search.
+        
+        The cutoff rate is the fraction of expanded nodes that were cut off,
+        and the effective branching factor is the number b for which b ** plies
+        equals the number of nodes searched.
+        
+        Returns:
+            Dictionary of search statistics
+        """
+        plies = (self.completed_depth or 0) + 1  # The root moves are one ply
+        return {
+            "nodes": self.nodes_evaluated,
+            "depth": self.completed_depth,
+            "interior_nodes": self.interior_nodes,
+            "cutoffs": self.cutoffs,
+            "cutoff_rate": self.cutoffs / self.interior_nodes if self.interior_nodes else 0.0,
+            "effective_branching_factor": self.nodes_evaluated ** (1 / plies),
+            "tt_hits": self.tt_hits,
+            "tt_misses": self.tt_misses,
+            "tt_collisions": self.tt_collisions,
+            "principal_variation": self.principal_variation,
+            "aspiration_failures": self.aspiration_failures,
+            "extended": self.extended,
+            "reduced": self.reduced,
+            "researched": self.researched,
+            "win_rate": self.win_rate,
+            "forced_line": self.forced_line,
+            "book_move": self.book_move,
+            "workers": self.workers,
+            # Worker CPU time per second of wall-clock time, i.e. how many
+            # workers were busy on average
+            "worker_utilization": (self.worker_time / self.parallel_time
+                                   if self.parallel_time else 1.0),
+            # Time-to-depth speedup over one worker, with measure_speedup
+            "parallel_speedup": self.parallel_speedup,
+            # Counters and timings of the search, if the AI is profiled
+            "profile": self.profiler.stats() if self.profiler else None,
+        }
+    
+    def search_root(self, board: GomokuBoard, possible_moves: List[Tuple[int, int]],
+                    depth: int, alpha: float = float('-inf'),
+                    beta: float = float('inf')) -> Tuple[Tuple[int, int], float]:
+        """
+        Search every root move to the given depth with the chosen algorithm.
+        
+        Args:
+            board: The current game board
+            possible_moves: Root moves in the order they are searched
+            depth: Search depth below the root moves
+            alpha, beta: Root window of a PVS search (other algorithms search
+                         every root move with the full window)
+            
+        Returns:
+            The best move and its score
+        """
+        self.root_ply = len(board.move_stack)
+        if self.workers > 1 and len(possible_moves) > 1 and depth >= PARALLEL_MIN_DEPTH:
+            return self.parallel_search_root(board, possible_moves, depth, alpha, beta)
+        
+        if depth == 0 and self.batch_leaves:
+            # Every root move leads to a leaf, so score them all at once
+            moves = [move for move in possible_moves if board.is_valid_move(*move)]
+            scores = self.batch_leaf_scores(board, moves, self.player)
+            best_score = max(scores)
+            return moves[scores.index(best_score)], best_score
+        
+        if self.algorithm == "pvs":
+            return self.pvs_root(board, possible_moves, depth, alpha, beta)
+        
         best_score = float('-inf')
         best_move = possible_moves[0]
         
-        # Apply chosen algorithm to find the best move
-        if self.algorithm == "minimax":
-            for move in possible_moves:
-                row, col = move
-                # Try this move
-                if board.is_valid_move(row, col):
-                    board.board[row][col] = self.player
-                    
-                    # Evaluate this move
-                    score = self.minimax(board, self.max_depth, False)
-                    
-                    # Undo the move
-                    board.board[row][col] = 0
-                    
-                    # Update best move if needed
-                    if score > best_score:
-                        best_score = score
-                        best_move = move
+        for move in possible_moves:
+            row, col = move
+            # Try this move
+            if board.is_valid_move(row, col):
+                board.push(move)
+                
+                # Evaluate this move with the chosen algorithm
+                if self.algorithm == "minimax":
+                    score = self.minimax(board, depth, False)
+                else:
+                    score = self.alpha_beta(board, depth, float('-inf'), float('inf'), False)
+                
+                # Undo the move
+                board.pop()
+                if self.search_stopped:
+                    break
+                
+                # Update best move if needed
+                if score > best_score:
+                    best_score = score
+                    best_move = move
         
-        elif self.algorithm == "alphabeta":
-            for move in possible_moves:
-                row, col = move
-                # Try this move
-                if board.is_valid_move(row, col):
-                    board.board[row][col] = self.player
-                    
-                    # Evaluate this move with alpha-beta pruning
-                    score = self.alpha_beta(board, self.max_depth, float('-inf'), float('inf'), False)
-                    
-                    # Undo the move
-                    board.board[row][col] = 0
-                    
-                    # Update best move if needed
-                    if score > best_score:
-                        best_score = score
-                        best_move = move
+        return best_move, best_score
+    
+    def pvs_root(self, board: GomokuBoard, possible_moves: List[Tuple[int, int]], depth: int,
+                 alpha: float, beta: float) -> Tuple[Tuple[int, int], float]:
+        """
+        Search the root moves with Principal Variation Search.
         
-        elapsed_time = time.time() - start_time
-        print(f"AI {self.algorithm} (player {self.player}) chose move {best_move}")
-        print(f"Nodes evaluated: {self.nodes_evaluated}, Time: {elapsed_time:.2f}s")
+        The first move is searched with the whole window and every later move
+        with a null window just above the best score so far, which only shows
+        whether the move is better; moves that are get a full re-search.
         
+        Args:
+            board: The current game board
+            possible_moves: Root moves in the order they are searched
+            depth: Search depth below the root moves
+            alpha, beta: Root window; a result outside it is only a bound
+            
+        Returns:
+            The best move and its score
+        """
+        best_score = float('-inf')
+        best_move = possible_moves[0]
+        line = []
+        
+        for move in possible_moves:
+            if not board.is_valid_move(*move):
+                continue
+            board.push(move)
+            if best_score == float('-inf'):
+                score = self.pvs(board, depth, alpha, beta, False)
+            else:
+                lower = max(alpha, best_score)
+                score = self.pvs(board, depth, lower, lower + 1, False)
+                if lower < score < beta:
+                    score = self.pvs(board, depth, lower, beta, False)
+            board.pop()
+            if self.search_stopped:
+                break
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+                line = [move] + self.pv_table[1]
+                if best_score >= beta:
+                    break  # Fail high: the caller re-searches with a wider window
+        
+        if not self.search_stopped:
+            self.principal_variation = line
+        return best_move, best_score
+    
+    def aspiration_search(self, board: GomokuBoard, possible_moves: List[Tuple[int, int]],
+                          depth: int, guess: float) -> Tuple[Tuple[int, int], float]:
+        """
+        Search the root in a narrow window around an expected score.
+        
+        A narrow window prunes more. If the score falls outside it, the
+        failing side is widened fourfold and the search repeated, until the
+        window would pass WIN_SCORE and that side is opened completely.
+        
+        Args:
+            board: The current game board
+            possible_moves: Root moves in the order they are searched
+            depth: Search depth below the root moves
+            guess: Expected score from an earlier iteration
+            
+        Returns:
+            The best move and its score
+        """
+        delta = ASPIRATION_WINDOW
+        alpha, beta = guess - delta, guess + delta
+        while True:
+            move, score = self.search_root(board, possible_moves, depth, alpha, beta)
+            if self.search_stopped or alpha < score < beta:
+                return move, score
+            
+            self.aspiration_failures += 1
+            delta *= 4
+            # The failed score is a bound, so the new window starts from it
+            if score <= alpha:
+                alpha = score - delta if delta < WIN_SCORE else float('-inf')
+            else:
+                beta = score + delta if delta < WIN_SCORE else float('inf')
+    
+    def mcts_search(self, board: GomokuBoard, time_limit: Optional[float]) -> Tuple[int, int]:
+        """
+        Choose a move with Monte Carlo Tree Search.
+        
+        With several workers each process grows its own tree from a different
+        seed and the root visits of all trees are added up (root
+        parallelization), so the playouts run in parallel without sharing
+        a tree. Nodes count playouts and the depth is that of the deepest tree.
+        
+        Args:
+            board: The current game board
+            time_limit: Time budget in seconds (None runs self.playouts playouts)
+            
+        Returns:
+            The most visited root move
+        """
+        deadline = time.time() + time_limit if time_limit is not None else None
+        playouts = self.playouts if time_limit is None else None
+        
+        if self.workers == 1:
+            mcts = self.mcts
+            if mcts is None or not self.persistent:
+                mcts = MCTS(progressive_widening=self.progressive_widening,
+                            seed=len(board.move_stack))
+            mcts.search(board, playouts, deadline, reuse=self.persistent, stop=self.stop_event)
+            if self.persistent:
+                self.mcts = mcts
+            results = [{"children": mcts.root_stats(), "playouts": mcts.playouts,
+                        "tree_depth": mcts.tree_depth}]
+            self.principal_variation = mcts.principal_variation()
+        else:
+            self.start_workers()
+            share = -(-playouts // self.workers) if playouts is not None else None
+            start_time = time.time()
+            futures = [self.executor.submit(run_worker_mcts, board, share, deadline,
+                                            len(board.move_stack) * self.workers + i,
+                                            self.progressive_widening)
+                       for i in range(self.workers)]
+            results = [future.result() for future in futures]
+            self.parallel_time += time.time() - start_time
+        
+        visits = {}
+        wins = {}
+        for result in results:
+            self.nodes_evaluated += result["playouts"]
+            self.worker_time += result.get("time", 0.0)
+            self.completed_depth = max(self.completed_depth or 0, result["tree_depth"])
+            for move, move_visits, move_wins in result["children"]:
+                visits[move] = visits.get(move, 0) + move_visits
+                wins[move] = wins.get(move, 0.0) + move_wins
+        
+        if not visits:
+            # Not even one playout finished; fall back to the best ordered move
+            return self.order_moves(board, self.generate_moves(board), self.player)[0]
+        best_move = max(visits, key=visits.get)
+        self.win_rate = wins[best_move] / visits[best_move]
         return best_move
-
+    
+    def search_config(self) -> dict:
+        """Get the constructor arguments that make another AI search like this one."""
+        return {
+            "player_number": self.player,
+            "algorithm": self.algorithm,
+            "max_depth": self.max_depth,
+            "tt_size": self.tt_size,
+            "tt_replacement": self.tt_replacement,
+            "move_ordering": self.move_ordering,
+            "batch_leaves": self.batch_leaves,
+            "symmetry_plies": self.symmetry_plies,
+            "canonical_stones": self.canonical_stones,
+            "extensions": self.extensions,
+            "reduction_moves": self.reduction_moves,
+            "narrow_ply": self.narrow_ply,
+        }
+    
+    def start_workers(self):
+        """
+        Create the worker processes, if not done yet.
+        
+        The stop event and the shared bound are handed to the workers once,
+        when the processes start, rather than with every task.
+        """
+        if self.executor is not None:
+            return
+        self.worker_stop = multiprocessing.Event()
+        self.worker_bound = multiprocessing.Value("d", float('-inf'))
+        if self.search_stopped:
+            self.worker_stop.set()  # Stopped before the workers existed
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                            initargs=(self.worker_bound, self.worker_stop))
+    
+    def parallel_search_root(self, board: GomokuBoard, possible_moves: List[Tuple[int, int]],
+                             depth: int, alpha: float = float('-inf'),
+                             beta: float = float('inf')) -> Tuple[Tuple[int, int], float]:
+        """
+        Search the root moves split across the worker processes.
+        
+        Moves are dealt out round-robin so every worker gets some of the
+        best-ordered ones. PVS searches the first move itself to get a bound,
+        as pvs_root does, and the workers test their moves with a null window
+        at the best score found so far by any of them, which they share;
+        only moves that beat it are searched with the full window and
+        reported, with their lines. Minimax and alpha-beta search every root
+        move with the full window, as they do in one process. The scores are
+        combined in the original move order, so equal scores go to the
+        earlier move, except that a PVS move tying a score found first by
+        another worker is not reported.
+        
+        Args:
+            board: The current game board
+            possible_moves: Root moves in the order they are searched
+            depth: Search depth below the root moves
+            alpha, beta: Root window of a PVS search
+            
+        Returns:
+            The best move and its score
+        """
+        self.start_workers()
+        start_time = time.time()
+        
+        scores = {}  # Move -> (score, line) of the moves that were reported
+        moves = possible_moves
+        bound = float('-inf')
+        if self.algorithm == "pvs":
+            first_move, bound = self.pvs_root(board, possible_moves[:1], depth, alpha, beta)
+            if self.search_stopped or bound >= beta:
+                return first_move, bound
+            scores[first_move] = (bound, self.principal_variation)
+            moves = possible_moves[1:]
+        
+        config = self.search_config()
+        self.worker_bound.value = bound
+        futures = [self.executor.submit(search_root_moves, config, board, moves[i::self.workers],
+                                        depth, self.deadline, (alpha, beta))
+                   for i in range(self.workers) if moves[i::self.workers]]
+        results = [future.result() for future in futures]
+        self.parallel_time += time.time() - start_time
+        
+        for result in results:
+            for move, score, line in result["scores"]:
+                scores[move] = (score, line)
+            self.nodes_evaluated += result["nodes"]
+            self.interior_nodes += result["interior_nodes"]
+            self.cutoffs += result["cutoffs"]
+            self.worker_time += result["time"]
+            if result["stopped"]:
+                self.search_stopped = True
+        
+        best_score = float('-inf')
+        best_move = possible_moves[0]
+        for move in possible_moves:
+            if move in scores and scores[move][0] > best_score:
+                best_score = scores[move][0]
+                best_move = move
+        if self.algorithm == "pvs" and not self.search_stopped:
+            self.principal_variation = scores[best_move][1]
+        return best_move, best_score
+    
+    def out_of_time(self) -> bool:
+        """
+        Check the time budget of a timed search, stopping the search once it runs out.
+        
+        Returns:
+            True if the search has been stopped
+        """
+        if not self.search_stopped and ((self.deadline is not None and time.time() >= self.deadline)
+                                        or self.stop_event.is_set()):
+            self.search_stopped = True
+        return self.search_stopped
+    
     def minimax(self, board: GomokuBoard, depth: int, is_maximizing: bool) -> float:
         """
         Minimax algorithm implementation.
@@ -102,13 +946,32 @@ class GomokuAI:
             The score of the best move
         """
         self.nodes_evaluated += 1
+        if self.deadline is not None and self.nodes_evaluated % 1024 == 0 and self.out_of_time():
+            return 0
+        
+        # Reuse a result from a transposition if it was searched deep enough
+        key, symmetry = self.tt_key(board)
+        entry = self.tt.probe(key) if self.tt else None
+        if entry is not None and entry.depth >= depth and entry.flag == EXACT:
+            return entry.score
         
         # Check terminal states
         if self.is_terminal(board) or depth == 0:
-            return self.evaluate(board)
+            score = self.leaf_value(board)
+            if self.tt:
+                self.tt.store(key, depth, score, EXACT, None)
+            return score
+        
+        if depth == 1 and self.batch_leaves:
+            result, best_move = self.batch_leaf_value(board, is_maximizing)
+            if self.tt:
+                self.tt.store(key, depth, result, EXACT,
+                              transform_move(best_move, symmetry, board.size))
+            return result
         
         # Get potential moves
-        possible_moves = board.get_neighbor_moves(2)
+        possible_moves = self.generate_moves(board)
+        best_move = None
         
         if is_maximizing:
             max_score = float('-inf')
@@ -116,22 +979,34 @@ class GomokuAI:
                 row, col = move
                 # Try this move
                 if board.is_valid_move(row, col):
-                    board.board[row][col] = self.player
+                    board.push(move)
                     score = self.minimax(board, depth - 1, False)
-                    board.board[row][col] = 0  # Undo the move
-                    max_score = max(max_score, score)
-            return max_score
+                    board.pop()  # Undo the move
+                    if self.search_stopped:
+                        return 0  # Result is discarded by get_move
+                    if score > max_score:
+                        max_score = score
+                        best_move = move
+            result = max_score
         else:
             min_score = float('inf')
             for move in possible_moves:
                 row, col = move
                 # Try this move
                 if board.is_valid_move(row, col):
-                    board.board[row][col] = self.opponent
+                    board.push(move)
                     score = self.minimax(board, depth - 1, True)
-                    board.board[row][col] = 0  # Undo the move
-                    min_score = min(min_score, score)
-            return min_score
+                    board.pop()  # Undo the move
+                    if self.search_stopped:
+                        return 0  # Result is discarded by get_move
+                    if score < min_score:
+                        min_score = score
+                        best_move = move
+            result = min_score
+        
+        if self.tt:
+            self.tt.store(key, depth, result, EXACT, transform_move(best_move, symmetry, board.size))
+        return result
 
     
     def alpha_beta(self, board: GomokuBoard, depth: int, alpha: float, beta: float, 
@@ -150,95 +1025,541 @@ class GomokuAI:
             The score of the best move
         """
         self.nodes_evaluated += 1
+        if self.deadline is not None and self.nodes_evaluated % 1024 == 0 and self.out_of_time():
+            return 0
+        alpha_orig, beta_orig = alpha, beta
+        
+        # Use the transposition table to narrow the window or cut off directly
+        tt_move = None
+        key, symmetry = self.tt_key(board)
+        entry = self.tt.probe(key) if self.tt else None
+        if entry is not None:
+            tt_move = transform_move(entry.best_move, inverse(symmetry), board.size)
+            if entry.depth >= depth:
+                if entry.flag == EXACT:
+                    return entry.score
+                elif entry.flag == LOWER_BOUND:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if alpha >= beta:
+                    return entry.score
         
         # Check terminal states
         if self.is_terminal(board) or depth == 0:
-            return self.evaluate(board)
+            value = self.leaf_value(board)
+            if self.tt:
+                self.tt.store(key, depth, value, EXACT, None)
+            return value
         
-        # Get potential moves
-        possible_moves = board.get_neighbor_moves(2)
+        # Children are only batched when the window cannot cut any of them
+        # off, so the batch scores no leaf that the loop below would skip
+        unbounded = beta == float('inf') if is_maximizing else alpha == float('-inf')
+        if depth == 1 and self.batch_leaves and unbounded:
+            # The exact value is a valid result for any window
+            value, best_move = self.batch_leaf_value(board, is_maximizing)
+            if self.tt:
+                self.tt.store(key, depth, value, EXACT, transform_move(best_move, symmetry, board.size))
+            return value
+        
+        # Get potential moves, trying the stored best move first
+        possible_moves = self.generate_moves(board)
+        player = self.player if is_maximizing else self.opponent
+        if self.move_ordering:
+            possible_moves = self.order_moves(board, possible_moves, player, tt_move)
+        elif tt_move is not None and tt_move in possible_moves:
+            possible_moves.remove(tt_move)
+            possible_moves.insert(0, tt_move)
+        best_move = None
+        self.interior_nodes += 1
         
         if is_maximizing:
             value = float('-inf')
-            for move in possible_moves:
+            for index, move in enumerate(possible_moves):
                 row, col = move
                 # Try this move
                 if board.is_valid_move(row, col):
-                    board.board[row][col] = self.player
-                    value = max(value, self.alpha_beta(board, depth - 1, alpha, beta, False))
-                    board.board[row][col] = 0  # Undo the move
+                    extension, reduction = self.selectivity(board, move, player, depth, index)
+                    board.push(move)
+                    self.extension_count += extension
+                    if reduction:
+                        # A quiet late move has to beat alpha at reduced depth to be searched fully
+                        score = self.alpha_beta(board, depth - 1 - reduction, alpha, alpha + 1, False)
+                        if score > alpha:
+                            self.researched += 1
+                            score = self.alpha_beta(board, depth - 1, alpha, beta, False)
+                    else:
+                        score = self.alpha_beta(board, depth - 1 + extension, alpha, beta, False)
+                    self.extension_count -= extension
+                    board.pop()  # Undo the move
+                    if self.search_stopped:
+                        return 0  # Result is discarded by get_move
+                    if score > value:
+                        value = score
+                        best_move = move
                     
                     # Pruning
                     alpha = max(alpha, value)
                     if alpha >= beta:
+                        self.record_cutoff(board, move, player, depth)
                         break  # Beta cutoff
-            return value
         else:
             value = float('inf')
-            for move in possible_moves:
+            for index, move in enumerate(possible_moves):
                 row, col = move
                 # Try this move
                 if board.is_valid_move(row, col):
-                    board.board[row][col] = self.opponent
-                    value = min(value, self.alpha_beta(board, depth - 1, alpha, beta, True))
-                    board.board[row][col] = 0  # Undo the move
+                    extension, reduction = self.selectivity(board, move, player, depth, index)
+                    board.push(move)
+                    self.extension_count += extension
+                    if reduction:
+                        # A quiet late move has to get below beta at reduced depth to be searched fully
+                        score = self.alpha_beta(board, depth - 1 - reduction, beta - 1, beta, True)
+                        if score < beta:
+                            self.researched += 1
+                            score = self.alpha_beta(board, depth - 1, alpha, beta, True)
+                    else:
+                        score = self.alpha_beta(board, depth - 1 + extension, alpha, beta, True)
+                    self.extension_count -= extension
+                    board.pop()  # Undo the move
+                    if self.search_stopped:
+                        return 0  # Result is discarded by get_move
+                    if score < value:
+                        value = score
+                        best_move = move
                     
                     # Pruning
                     beta = min(beta, value)
                     if beta <= alpha:
+                        self.record_cutoff(board, move, player, depth)
                         break  # Alpha cutoff
+        
+        if self.tt:
+            if value <= alpha_orig:
+                flag = UPPER_BOUND
+            elif value >= beta_orig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.tt.store(key, depth, value, flag, transform_move(best_move, symmetry, board.size))
+        return value
+    
+    def pvs(self, board: GomokuBoard, depth: int, alpha: float, beta: float,
+            is_maximizing: bool) -> float:
+        """
+        Principal Variation Search (NegaScout) implementation.
+        
+        Like alpha_beta, but after the first move every move is searched
+        with a null window that only tests whether it beats the best score so
+        far, and is searched again with the real window if it does. With good
+        move ordering most tests fail, and null-window searches are cheap.
+        The best line below the node is left in pv_table at the node's ply.
+        
+        Args:
+            board: The current game board
+            depth: Current search depth
+            alpha: Alpha value for pruning
+            beta: Beta value for pruning
+            is_maximizing: True if maximizing player's turn, False otherwise
+            
+        Returns:
+            The score of the best move
+        """
+        self.nodes_evaluated += 1
+        ply = len(board.move_stack) - self.root_ply
+        pv_table = self.pv_table
+        while len(pv_table) <= ply + 1:
+            pv_table.append([])
+        pv_table[ply] = []
+        if self.deadline is not None and self.nodes_evaluated % 1024 == 0 and self.out_of_time():
+            return 0
+        alpha_orig, beta_orig = alpha, beta
+        
+        # Use the transposition table to narrow the window or cut off directly
+        tt_move = None
+        key, symmetry = self.tt_key(board)
+        entry = self.tt.probe(key) if self.tt else None
+        if entry is not None:
+            tt_move = transform_move(entry.best_move, inverse(symmetry), board.size)
+            if entry.depth >= depth:
+                if entry.flag == EXACT:
+                    return entry.score
+                elif entry.flag == LOWER_BOUND:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if alpha >= beta:
+                    return entry.score
+        
+        # Check terminal states
+        if self.is_terminal(board) or depth == 0:
+            value = self.leaf_value(board)
+            if self.tt:
+                self.tt.store(key, depth, value, EXACT, None)
             return value
+        
+        # Get potential moves, trying the stored best move first
+        possible_moves = self.generate_moves(board)
+        player = self.player if is_maximizing else self.opponent
+        if self.move_ordering:
+            possible_moves = self.order_moves(board, possible_moves, player, tt_move)
+        elif tt_move is not None and tt_move in possible_moves:
+            possible_moves.remove(tt_move)
+            possible_moves.insert(0, tt_move)
+        best_move = None
+        self.interior_nodes += 1
+        
+        value = float('-inf') if is_maximizing else float('inf')
+        for index, move in enumerate(possible_moves):
+            if not board.is_valid_move(*move):
+                continue
+            extension, reduction = self.selectivity(board, move, player, depth, index)
+            child_depth = depth - 1 + extension
+            board.push(move)
+            self.extension_count += extension
+            if best_move is None:
+                score = self.pvs(board, child_depth, alpha, beta, not is_maximizing)
+            elif is_maximizing:
+                # Test whether the move beats alpha, then search it properly if so;
+                # a quiet late move is tested at reduced depth first
+                score = self.pvs(board, child_depth - reduction, alpha, alpha + 1, False)
+                if reduction and score > alpha:
+                    self.researched += 1
+                    score = self.pvs(board, child_depth, alpha, alpha + 1, False)
+                if alpha < score < beta:
+                    score = self.pvs(board, child_depth, alpha, beta, False)
+            else:
+                # Test whether the move gets below beta, then search it properly if so
+                score = self.pvs(board, child_depth - reduction, beta - 1, beta, True)
+                if reduction and score < beta:
+                    self.researched += 1
+                    score = self.pvs(board, child_depth, beta - 1, beta, True)
+                if alpha < score < beta:
+                    score = self.pvs(board, child_depth, alpha, beta, True)
+            self.extension_count -= extension
+            board.pop()  # Undo the move
+            if self.search_stopped:
+                return 0  # Result is discarded by get_move
+            
+            if best_move is None or (score > value if is_maximizing else score < value):
+                value = score
+                best_move = move
+                pv_table[ply] = [move] + pv_table[ply + 1]
+            
+            # Pruning
+            if is_maximizing:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                self.record_cutoff(board, move, player, depth)
+                break
+        
+        if self.tt:
+            if value <= alpha_orig:
+                flag = UPPER_BOUND
+            elif value >= beta_orig:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.tt.store(key, depth, value, flag, transform_move(best_move, symmetry, board.size))
+        return value
+    
+    def batch_leaf_value(self, board: GomokuBoard, is_maximizing: bool) -> Tuple[float, Tuple[int, int]]:
+        """
+        Get the value of a node whose children are all leaves with one batched evaluation.
+        
+        The children are scored directly rather than searched one by one, so
+        they are not counted as separate calls or looked up in the
+        transposition table. All of them are scored, so alpha-beta only uses
+        this where its window could not prune any.
+        
+        Args:
+            board: The current game board (one ply above the leaves)
+            is_maximizing: True if maximizing player's turn, False otherwise
+            
+        Returns:
+            The value of the node and the child move that achieves it
+        """
+        player = self.player if is_maximizing else self.opponent
+        moves = self.generate_moves(board)
+        scores = self.batch_leaf_scores(board, moves, player)
+        value = max(scores) if is_maximizing else min(scores)
+        return value, moves[scores.index(value)]
+    
+    def batch_leaf_scores(self, board: GomokuBoard, moves: List[Tuple[int, int]],
+                          player: int) -> List[float]:
+        """
+        Evaluate the positions after each of several moves in one vectorized call.
+        
+        Args:
+            board: The current game board
+            moves: Empty cells to play
+            player: Player making the moves
+            
+        Returns:
+            The leaf_value of the board after each move, in move order
+        """
+        self.nodes_evaluated += len(moves)
+        
+        # Square window over the active region and the moves, so the cost
+        # follows the stones rather than the board area
+        top, left, bottom, right = board.active_region(BATCH_MARGIN)
+        rows, cols = zip(*moves)
+        top = min(top, max(0, min(rows) - BATCH_MARGIN))
+        left = min(left, max(0, min(cols) - BATCH_MARGIN))
+        bottom = max(bottom, min(board.size, max(rows) + BATCH_MARGIN + 1))
+        right = max(right, min(board.size, max(cols) + BATCH_MARGIN + 1))
+        side = max(bottom - top, right - left)
+        side = min(board.size, -(-side // BATCH_WINDOW_STEP) * BATCH_WINDOW_STEP)
+        top = min(top, board.size - side)
+        left = min(left, board.size - side)
+        
+        stones = board.stones()
+        stone_rows = [r for r, _, _ in stones]
+        stone_cols = [c for _, c, _ in stones]
+        
+        evaluator = self.batch_evaluators.get(side)
+        if evaluator is None:
+            evaluator = self.batch_evaluators[side] = BatchEvaluator(side)
+        window = np.zeros((side, side), dtype=int)
+        if stones:
+            window[np.array(stone_rows) - top, np.array(stone_cols) - left] = [p for _, _, p in stones]
+        
+        # One copy of the window per move, with the move's stone added
+        children = np.repeat(window[np.newaxis], len(moves), axis=0)
+        children[np.arange(len(moves)), np.array(rows) - top, np.array(cols) - left] = player
+        
+        scores = evaluator.scores(children)  # From player 1's point of view
+        scores = (scores if self.player == 1 else -scores).tolist()
+        
+        # A move that completes five ends the game, so it is scored as the
+        # search scores a won leaf; the move score rules out most moves cheaply
+        move_score = board.evaluator.move_score
+        grid = board.board
+        ply = len(board.move_stack) + 1 - self.root_ply
+        for index, (row, col) in enumerate(moves):
+            if move_score(row, col, player) >= WIN_SCORE:
+                grid[row, col] = player
+                if board.check_win(row, col):
+                    scores[index] = self.mate_score(player, ply)
+                grid[row, col] = 0
+        return scores
+    
+    def generate_moves(self, board: GomokuBoard) -> List[Tuple[int, int]]:
+        """
+        Get the candidate moves of a position (the empty cells near stones).
+        
+        Within symmetry_plies of the root, moves that a symmetry of the
+        position maps onto another candidate are dropped: they lead to
+        positions with the same value.
+        
+        Args:
+            board: The current game board
+            
+        Returns:
+            List of (row, col) moves in no particular order
+        """
+        moves = board.get_neighbor_moves(2)
+        ply = len(board.move_stack) - self.root_ply
+        if ply < self.symmetry_plies:
+            moves = unique_moves(moves, symmetry_group(board), board.size)
+        if self.narrow_ply is not None and ply >= self.narrow_ply and board.stone_count:
+            # Deep in the tree, only the cells touching a stone
+            grid = board.board
+            adjacent = neighborhoods(board.size, 1)
+            near = [(row, col) for row, col in moves
+                    if any(grid[r][c] for r, c in adjacent[row * board.size + col])]
+            moves = near or moves
+        return moves
+    
+    def selectivity(self, board: GomokuBoard, move: Tuple[int, int], player: int,
+                    depth: int, index: int) -> Tuple[int, int]:
+        """
+        Decide whether a move of an alpha-beta or PVS node is extended or reduced.
+        
+        Args:
+            board: The current game board (before the move)
+            move: The move
+            player: Player making the move
+            depth: Remaining depth of the node
+            index: Position of the move in the node's search order
+            
+        Returns:
+            The plies the move is extended by and the plies it is reduced by
+            (at most one of them is nonzero)
+        """
+        if not self.extensions and not self.reduction_moves:
+            return 0, 0
+        row, col = move
+        move_score = board.evaluator.move_score
+        attack = move_score(row, col, player)
+        if attack >= THREAT_SCORE:
+            # Fours and open threes force a reply, so a line that reaches the
+            # horizon with one is followed further instead of scored statically
+            if depth == 1 and self.extension_count < self.extensions:
+                self.extended += 1
+                return 1, 0
+            return 0, 0
+        if (self.reduction_moves and index >= self.reduction_moves and depth >= LMR_MIN_DEPTH
+                and move_score(row, col, 3 - player) < THREAT_SCORE):
+            ply = len(board.move_stack) - self.root_ply
+            if ply >= len(self.killers) or move not in self.killers[ply]:
+                self.reduced += 1
+                # Moves far down the order are reduced one ply more
+                reduction = LMR_REDUCTION + (index >= 2 * self.reduction_moves)
+                return 0, min(reduction, depth - 1)
+        return 0, 0
+    
+    def tt_key(self, board: GomokuBoard) -> Tuple[int, int]:
+        """
+        Get the transposition table key of a position.
+        
+        Args:
+            board: The position
+            
+        Returns:
+            The key and the symmetry that maps the position to the key's
+            orientation; best moves are stored in that orientation
+        """
+        if board.stone_count < self.canonical_stones:
+            return canonical_hash(board)
+        return board.hash, 0
+    
+    def order_moves(self, board: GomokuBoard, moves: List[Tuple[int, int]], player: int,
+                    tt_move: Optional[Tuple[int, int]] = None) -> List[Tuple[int, int]]:
+        """
+        Sort moves so the ones most likely to cause a cutoff are searched first.
+        
+        The order is: the transposition table move, immediate wins, blocks of
+        the opponent's immediate wins, threat-creating moves by pattern score,
+        killer moves of the current ply, and the rest by history score.
+        
+        Args:
+            board: The current game board
+            moves: Candidate moves
+            player: Player to move (1 or 2)
+            tt_move: Best move stored in the transposition table, if any
+            
+        Returns:
+            The moves in search order
+        """
+        opponent = 3 - player
+        ply = len(board.move_stack) - self.root_ply
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        move_score = board.evaluator.move_score  # Pattern table lookups on the line codes
+        keyed = []
+        for move in moves:
+            row, col = move
+            if move == tt_move:
+                key = (6, 0, 0)
+            else:
+                attack = move_score(row, col, player)
+                defense = move_score(row, col, opponent)
+                if attack >= WIN_SCORE:
+                    key = (5, attack, 0)  # Immediate win
+                elif defense >= WIN_SCORE:
+                    key = (4, defense, 0)  # Forced block
+                elif attack >= THREAT_SCORE or defense >= THREAT_SCORE:
+                    key = (3, attack + defense, 0)
+                elif move in killers:
+                    key = (2, 0, 0)
+                else:
+                    key = (1, self.history.get((player, move), 0), attack + defense)
+            keyed.append((key, move))
+        
+        keyed.sort(reverse=True)
+        return [move for _, move in keyed]
+    
+    def record_cutoff(self, board: GomokuBoard, move: Tuple[int, int], player: int, depth: int):
+        """
+        Update the cutoff statistics, killer moves and history table after a cutoff.
+        
+        Args:
+            board: The current game board (at the node where the cutoff happened)
+            move: The move that caused the cutoff
+            player: Player who made the move
+            depth: Remaining depth of the node where the cutoff happened
+        """
+        self.cutoffs += 1
+        ply = len(board.move_stack) - self.root_ply
+        while len(self.killers) <= ply:
+            self.killers.append([None, None])
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[(player, move)] = self.history.get((player, move), 0) + depth * depth
     
     def is_terminal(self, board: GomokuBoard) -> bool:
         """
         Check if the current board state is terminal (game over).
         
+        The search plays its moves with board.push, which checks for five in
+        a row and a full board as each move is made, so this reads the result.
+        
         Args:
             board: The current game board
             
         Returns:
             True if the game is over, False otherwise
         """
-        # Check for win conditions based on the last move
-        for r in range(board.size):
-            for c in range(board.size):
-                if board.board[r][c] != 0:
-                    player = board.board[r][c]
-                    # Check horizontal, vertical, and diagonal wins
-                    directions = [
-                        [(0, 1), (0, -1)],   # Horizontal
-                        [(1, 0), (-1, 0)],   # Vertical
-                        [(1, 1), (-1, -1)],  # Diagonal \
-                        [(1, -1), (-1, 1)]   # Diagonal /
-                    ]
-                    
-                    for dir_pair in directions:
-                        count = 1  # Count the current stone
-                        
-                        # Check both directions
-                        for dr, dc in dir_pair:
-                            r1, c1 = r, c
-                            
-                            # Count consecutive stones in this direction
-                            for _ in range(4):  # We need 5 in a row, already counted 1
-                                r1, c1 = r1 + dr, c1 + dc
-                                if (0 <= r1 < board.size and 
-                                    0 <= c1 < board.size and 
-                                    board.board[r1][c1] == player):
-                                    count += 1
-                                else:
-                                    break
-                        
-                        if count >= 5:
-                            return True
-                    
-        # Check if the board is full
-        return np.count_nonzero(board.board) == board.size * board.size
+        return board.game_over
+    
+    def leaf_value(self, board: GomokuBoard) -> float:
+        """
+        Score a leaf of the search.
+        
+        A game won on the board scores MATE_SCORE less the plies from the
+        root, so quicker wins and slower losses are preferred; any other
+        position gets its static evaluation.
+        
+        Args:
+            board: The current game board
+            
+        Returns:
+            The score from the AI player's point of view
+        """
+        if board.winner is None:
+            return self.evaluate(board)
+        return self.mate_score(board.winner, len(board.move_stack) - self.root_ply)
+    
+    def mate_score(self, winner: int, ply: int) -> float:
+        """
+        Get the score of a game won at some ply below the root.
+        
+        Args:
+            winner: Player who completed five in a row
+            ply: Moves from the search root to the winning move's position
+            
+        Returns:
+            The score from the AI player's point of view
+        """
+        score = MATE_SCORE - ply
+        return score if winner == self.player else -score
     
     def evaluate(self, board: GomokuBoard) -> float:
         """
         Evaluate the current board state for the AI player.
         
+        The board keeps its pattern scores up to date line by line as stones
+        are placed and removed, so this is a constant-time lookup. It returns
+        the same score as evaluate_full_scan.
+        Positive scores favor the AI player, negative scores favor the opponent.
+        
+        Args:
+            board: The current game board
+            
+        Returns:
+            A score representing how favorable the board is for the AI player
+        """
+        score = board.evaluator.score  # From player 1's point of view
+        return score if self.player == 1 else -score
+    
+    def evaluate_full_scan(self, board: GomokuBoard) -> float:
+        """
+        Evaluate the board by scanning every stone (reference for evaluate).
+        
         This function assigns a score to the current board state based on various patterns.
         Positive scores favor the AI player, negative scores favor the opponent.
         
@@ -320,27 +1641,104 @@ class GomokuAI:
             board.board[r1][c1] == 0):
             open_ends += 1
         
-        # Assign scores based on pattern
-        if consecutive >= 5:
-            return 10000  # Win condition
-        elif consecutive == 4:
-            if open_ends == 2:
-                return 5000  # Open four (will lead to win)
-            elif open_ends == 1:
-                return 500   # Four with one open end
-        elif consecutive == 3:
-            if open_ends == 2:
-                return 200   # Open three
-            elif open_ends == 1:
-                return 50    # Three with one open end
-        elif consecutive == 2:
-            if open_ends == 2:
-                return 10    # Open two
-            elif open_ends == 1:
-                return 5     # Two with one open end
-        elif consecutive == 1:
-            if open_ends > 0:
-                return 1     # Single stone with open end(s)
-        
-        return 0  # Default score
+        return pattern_score(consecutive, open_ends)
+
+
+_worker_ais = {}
+_worker_bound = None  # Shared best root score, set by init_worker
+_worker_stop = None  # Shared stop event, set by init_worker
 
+
+def init_worker(bound, stop):
+    """
+    Keep the objects shared with the parent in a new worker process.
+    
+    Args:
+        bound: Shared value holding the best root score found by any worker
+        stop: Event set by GomokuAI.stop to end the workers' searches
+    """
+    global _worker_bound, _worker_stop
+    _worker_bound, _worker_stop = bound, stop
+
+
+def run_worker_mcts(board: GomokuBoard, playouts: Optional[int], deadline: Optional[float],
+                    seed: int, progressive_widening: bool) -> dict:
+    """Run run_mcts in a worker process, ending early if the search is stopped."""
+    return run_mcts(board, playouts, deadline, seed, progressive_widening, _worker_stop)
+
+
+def search_root_moves(config: dict, board: GomokuBoard, moves: List[Tuple[int, int]],
+                      depth: int, deadline: Optional[float],
+                      window: Tuple[float, float]) -> dict:
+    """
+    Search some of the root moves in a worker process of the parallel search.
+    
+    PVS tests each move with a null window at the best score found so far
+    by any worker (kept in the shared bound) and only searches and reports
+    the moves that beat it; other algorithms report every move.
+    
+    Args:
+        config: GomokuAI constructor arguments of the searching AI
+        board: The current game board
+        moves: Root moves assigned to this worker
+        depth: Search depth below the root moves
+        deadline: Wall-clock time at which the search stops, if any
+        window: Root window (alpha, beta) of a PVS search
+        
+    Returns:
+        Dictionary with the (move, score, line) of every reported move and
+        the search statistics
+    """
+    key = tuple(sorted(config.items()))
+    ai = _worker_ais.get(key)
+    if ai is None:
+        ai = GomokuAI(threat_search=False, **config)
+        _worker_ais[key] = ai
+    
+    alpha, beta = window
+    bound = _worker_bound
+    ai.reset_search()
+    # The searches poll the stop event through out_of_time, which they only
+    # call with a deadline, so an untimed search gets one that never passes
+    ai.deadline = deadline if deadline is not None else float('inf')
+    ai.stop_event = _worker_stop
+    start_time = time.process_time()  # CPU time, so workers sharing a core do not overstate their use
+    scores = []
+    try:
+        for move in moves:
+            if ai.algorithm != "pvs":
+                _, score = ai.search_root(board, [move], depth)
+                if ai.search_stopped:
+                    break
+                scores.append((move, score, []))
+                continue
+            
+            lower = max(alpha, bound.value)
+            if lower >= beta:
+                break  # Another move failed high; the caller widens the window
+            if lower == float('-inf'):
+                _, score = ai.search_root(board, [move], depth, alpha, beta)
+            else:
+                # Test whether the move beats the best score so far, as pvs_root does
+                _, score = ai.search_root(board, [move], depth, lower, lower + 1)
+                if lower < score < beta and not ai.search_stopped:
+                    _, score = ai.search_root(board, [move], depth, lower, beta)
+            if ai.search_stopped:
+                break
+            if score > lower:
+                scores.append((move, score, ai.principal_variation))
+                with bound.get_lock():
+                    if score > bound.value:
+                        bound.value = score
+    finally:
+        ai.deadline = None
+        ai.stop_event = threading.Event()
+    
+    return {
+        "scores": scores,
+        "nodes": ai.nodes_evaluated,
+        "interior_nodes": ai.interior_nodes,
+        "cutoffs": ai.cutoffs,
+        "time": time.process_time() - start_time,
+        "stopped": ai.search_stopped,
+    }
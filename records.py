@@ -0,0 +1,185 @@
+import os
+import struct
+from typing import Tuple, List, Iterator, Optional
+from board import GomokuBoard
+
+# File layout: MAGIC, then one record per game: GAME header, the engine
+# names (UTF-8) and the moves, one byte each (row << 4 | col) on boards up
+# to 16x16 and two bytes (row * size + col, little-endian) on larger ones
+MAGIC = b"GMKGAME1"
+GAME = struct.Struct("<BBHBB")  # Board size, result, move count, name lengths of black and white
+RESULTS = ("*", "1-0", "0-1", "1/2-1/2")  # Result codes; "*" is an unfinished game
+SMALL_BOARD = 16  # Largest board size stored with one byte per move
+
+# Byte -> (row, col) on small boards
+_SMALL_MOVES = [(byte >> 4, byte & 0xF) for byte in range(256)]
+
+
+def is_record_file(path: str) -> bool:
+    """Check whether a file is in the binary game record format."""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def encode_moves(moves: List[Tuple[int, int]], size: int) -> bytes:
+    """
+    Pack a move list into bytes.
+
+    Args:
+        moves: Moves as (row, col)
+        size: The size of the board
+
+    Returns:
+        One byte per move on boards up to SMALL_BOARD, two bytes otherwise
+    """
+    if size <= SMALL_BOARD:
+        return bytes((row << 4) | col for row, col in moves)
+    return struct.pack(f"<{len(moves)}H", *(row * size + col for row, col in moves))
+
+
+def decode_moves(data: bytes, size: int) -> List[Tuple[int, int]]:
+    """
+    Unpack a move list packed by encode_moves.
+
+    Args:
+        data: The packed moves
+        size: The size of the board
+
+    Returns:
+        Moves as (row, col)
+    """
+    if size <= SMALL_BOARD:
+        return [_SMALL_MOVES[byte] for byte in data]
+    return [divmod(cell, size) for cell in struct.unpack(f"<{len(data) // 2}H", data)]
+
+
+def encode_name(name: Optional[str]) -> bytes:
+    """
+    Encode an engine name for a game header.
+
+    Args:
+        name: The engine name, if any
+
+    Returns:
+        The name as UTF-8, cut to 255 bytes without splitting a character
+    """
+    return (name or "").encode()[:255].decode(errors="ignore").encode()
+
+
+class RecordWriter:
+    """
+    Appends games to a record file one at a time.
+
+    Every game is written as soon as it is given, so a file that is being
+    filled by a long run can already be read and keeps the finished games
+    if the run is interrupted.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a record file for appending, creating it if needed.
+
+        Args:
+            path: Path of the record file
+        """
+        if os.path.exists(path) and os.path.getsize(path) > 0 and not is_record_file(path):
+            raise ValueError(f"Not a game record file: {path}")
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+        self.games = 0
+
+    def write(self, game: dict):
+        """
+        Append a game.
+
+        Args:
+            game: Dictionary with "size", "moves" and "result" ("1-0", "0-1",
+                  "1/2-1/2" or "*"), and optionally the engine names "black"
+                  and "white", as in tournament game records
+        """
+        size = game["size"]
+        moves = game["moves"]
+        if len(moves) > 0xFFFF:
+            raise ValueError("Too many moves for a game record")
+        black = encode_name(game.get("black"))
+        white = encode_name(game.get("white"))
+        self.file.write(GAME.pack(size, RESULTS.index(game["result"]), len(moves),
+                                  len(black), len(white)))
+        self.file.write(black + white + encode_moves(moves, size))
+        self.games += 1
+
+    def flush(self):
+        """Write the buffered games to the file."""
+        self.file.flush()
+
+    def close(self):
+        """Close the file."""
+        self.file.close()
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    Read the games of a record file one at a time.
+
+    The file is read through a buffer, so files of any size can be
+    scanned without loading them into memory.
+
+    Args:
+        path: Path of the record file
+
+    Yields:
+        Dictionaries with "size", "black", "white", "result" and "moves"
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a game record file: {path}")
+        while True:
+            header = f.read(GAME.size)
+            if not header:
+                return
+            if len(header) < GAME.size:
+                raise ValueError(f"Truncated game record in {path}")
+            size, result, count, black_length, white_length = GAME.unpack(header)
+            names = f.read(black_length + white_length)
+            move_bytes = count if size <= SMALL_BOARD else 2 * count
+            data = f.read(move_bytes)
+            if len(names) < black_length + white_length or len(data) < move_bytes:
+                raise ValueError(f"Truncated game record in {path}")
+            yield {
+                "size": size,
+                "black": names[:black_length].decode(),
+                "white": names[black_length:].decode(),
+                "result": RESULTS[result],
+                "moves": decode_moves(data, size),
+            }
+
+
+def replay(game: dict, max_plies: Optional[int] = None) -> Iterator[Tuple[GomokuBoard, Tuple[int, int]]]:
+    """
+    Step through the positions of a game.
+
+    One board is reused for the whole game: each move is played with push
+    after it is yielded, so no position is copied. Copy the board with
+    copy_board to keep a position.
+
+    Args:
+        game: Game record with "size" and "moves"
+        max_plies: Number of moves to replay (None for all of them)
+
+    Yields:
+        The board before each move, and the move
+    """
+    board = GomokuBoard(game["size"])
+    for move in game["moves"][:max_plies]:
+        move = tuple(move)
+        if board.game_over or not board.is_valid_move(*move):
+            raise ValueError(f"Invalid move in game record: {move}")
+        yield board, move
+        board.push(move)
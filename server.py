@@ -0,0 +1,468 @@
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, List
+from board import GomokuBoard
+from player import GomokuAI
+
+# Longest line a client may send, in bytes
+MAX_REQUEST_SIZE = 1 << 16
+
+
+class FairQueue:
+    """
+    Queue of search requests that serves its clients in turn.
+
+    Every client has its own FIFO of requests, and get takes the next
+    request of the next client in rotation, so a client that submits many
+    searches cannot hold up everyone else.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self.requests = {}  # Client -> deque of its waiting requests
+        self.order = collections.deque()  # Clients with waiting requests, next one first
+        self.changed = asyncio.Condition()
+
+    def __len__(self) -> int:
+        return sum(len(requests) for requests in self.requests.values())
+
+    async def put(self, client, request):
+        """
+        Add a request to the end of a client's queue.
+
+        Args:
+            client: Key of the client that made the request
+            request: The request
+        """
+        async with self.changed:
+            if client not in self.requests:
+                self.requests[client] = collections.deque()
+                self.order.append(client)
+            self.requests[client].append(request)
+            self.changed.notify()
+
+    async def get(self):
+        """
+        Wait for the next request.
+
+        Returns:
+            The client and its oldest waiting request
+        """
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.order)
+            client = self.order.popleft()
+            requests = self.requests[client]
+            request = requests.popleft()
+            if requests:
+                self.order.append(client)  # The client's next request waits its turn
+            else:
+                del self.requests[client]
+            return client, request
+
+    def drop(self, client) -> list:
+        """
+        Remove the waiting requests of a client, e.g. after it disconnected.
+
+        Args:
+            client: Key of the client
+
+        Returns:
+            The removed requests
+        """
+        requests = self.requests.pop(client, None)
+        if requests is None:
+            return []
+        self.order.remove(client)
+        return list(requests)
+
+
+class GameSession:
+    """A game hosted by the server."""
+
+    __slots__ = ("board", "searching", "last_used")
+
+    def __init__(self, size: int):
+        """
+        Initialize a game on an empty board.
+
+        Args:
+            size: The size of the board
+        """
+        self.board = GomokuBoard(size)
+        self.searching = False  # Whether an AI move is queued or being searched
+        self.last_used = time.time()
+
+    def state(self) -> dict:
+        """Get the position of the game as JSON-ready data."""
+        board = self.board
+        return {
+            "size": board.size,
+            "moves": [list(move) for move in board.move_stack],
+            "current_player": board.current_player,
+            "game_over": board.game_over,
+            "winner": board.winner,
+        }
+
+
+class GameServer:
+    """
+    Hosts many concurrent games over a line-based JSON protocol on TCP.
+
+    Each request is one JSON object per line with an "op" and an optional
+    "id" that is echoed in the response, so a client can send several
+    requests without waiting. Responses are {"id", "ok": true, ...} or
+    {"id", "ok": false, "error"}. The operations are:
+
+        new_game {size}                     -> {game, ...state}
+        state {game}                        -> {...state}
+        move {game, row, col}               -> {...state}
+        ai_move {game, algorithm, time}     -> {move, nodes, depth, search_time, ...state}
+        close {game}                        -> {}
+        stats {}                            -> {games, queued_searches}
+
+    The games live in the server process. AI moves are searched in a
+    bounded process pool with a time budget per request, and the waiting
+    searches are served round-robin across connections (see FairQueue).
+    """
+
+    ALGORITHMS = ("minimax", "alphabeta", "pvs", "mcts")
+
+    def __init__(self, workers: int = 2, max_games: int = 10000, max_time: float = 5.0,
+                 default_time: float = 1.0, idle_timeout: float = 3600.0):
+        """
+        Initialize the server.
+
+        Args:
+            workers: Number of processes searching AI moves
+            max_games: Most games hosted at once
+            max_time: Largest time budget a request may ask for, in seconds
+            default_time: Time budget of requests that do not give one
+            idle_timeout: Seconds after which a game nobody used is closed
+        """
+        self.workers = workers
+        self.max_games = max_games
+        self.max_time = max_time
+        self.default_time = default_time
+        self.idle_timeout = idle_timeout
+        self.games = {}  # Game id -> GameSession
+        self.game_ids = itertools.count(1)
+        self.client_ids = itertools.count(1)
+        self.queue = FairQueue()
+        self.executor = None
+        self.tasks = []
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """
+        Start the search workers and listen for connections.
+
+        Args:
+            host: Address to listen on
+            port: TCP port to listen on (0 picks a free one)
+
+        Returns:
+            The listening asyncio server
+        """
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        # One task per process, so the pool never holds more searches than it can run
+        self.tasks = [asyncio.create_task(self.run_searches()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self.close_idle_games()))
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_REQUEST_SIZE)
+
+    def close(self):
+        """Stop the search workers."""
+        for task in self.tasks:
+            task.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serve the requests of one connection until it closes.
+
+        Args:
+            reader: Stream of the client's requests
+            writer: Stream the responses are written to
+        """
+        client = next(self.client_ids)
+        pending = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    break  # Line longer than MAX_REQUEST_SIZE
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                # Requests are answered as they finish, not in order
+                task = asyncio.create_task(self.respond(client, line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        finally:
+            for request in self.queue.drop(client):
+                request["future"].cancel()
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def respond(self, client: int, line: bytes, writer: asyncio.StreamWriter):
+        """
+        Handle one request and write its response.
+
+        Args:
+            client: Key of the connection
+            line: The request as a line of JSON
+            writer: Stream the response is written to
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            response = await self.handle(client, request)
+            response["ok"] = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Every bad request gets an error reply, never a silent drop
+            response = {"ok": False, "error": str(e) or type(e).__name__}
+        response["id"] = request_id
+        try:
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            # The client is gone; closing the stream ends handle_client,
+            # which drops the connection's waiting searches
+            writer.close()
+
+    async def handle(self, client: int, request: dict) -> dict:
+        """
+        Carry out a request.
+
+        Args:
+            client: Key of the connection
+            request: The decoded request
+
+        Returns:
+            The response data
+        """
+        op = request.get("op")
+        if op == "stats":
+            return {"games": len(self.games), "queued_searches": len(self.queue)}
+        if op == "new_game":
+            size = finite(request.get("size", 15), "size")
+            if size != int(size) or not 5 <= size <= 19:
+                raise ValueError("Board size must be between 5 and 19")
+            if len(self.games) >= self.max_games:
+                raise ValueError("Too many games")
+            game_id = next(self.game_ids)
+            session = GameSession(int(size))
+            self.games[game_id] = session
+            return {"game": game_id, **session.state()}
+
+        session = self.session(request)
+        if op == "state":
+            return session.state()
+        if op == "move":
+            if session.searching:
+                raise ValueError("The AI is thinking in this game")
+            row, col = finite(request["row"], "row"), finite(request["col"], "col")
+            if row != int(row) or col != int(col):
+                raise ValueError("Row and column must be integers")
+            row, col = int(row), int(col)
+            if not session.board.make_move(row, col):
+                raise ValueError(f"Invalid move: ({row}, {col})")
+            return session.state()
+        if op == "ai_move":
+            return await self.ai_move(client, session, request)
+        if op == "close":
+            del self.games[request["game"]]
+            return {}
+        raise ValueError(f"Unknown op: {op}")
+
+    def session(self, request: dict) -> GameSession:
+        """Get the game a request refers to."""
+        session = self.games.get(request.get("game"))
+        if session is None:
+            raise KeyError(f"No such game: {request.get('game')}")
+        session.last_used = time.time()
+        return session
+
+    async def ai_move(self, client: int, session: GameSession, request: dict) -> dict:
+        """
+        Queue an AI search for a game, wait for it and play the move.
+
+        Args:
+            client: Key of the connection
+            session: The game
+            request: The ai_move request
+
+        Returns:
+            The move, search statistics and the new state of the game
+        """
+        algorithm = request.get("algorithm", "pvs")
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+        time_limit = min(finite(request.get("time", self.default_time), "time"), self.max_time)
+        if time_limit <= 0:
+            raise ValueError("Time budget must be positive")
+        if session.board.game_over:
+            raise ValueError("The game is over")
+        if session.searching:
+            raise ValueError("The AI is already thinking in this game")
+
+        future = asyncio.get_running_loop().create_future()
+        session.searching = True
+        try:
+            await self.queue.put(client, {
+                "future": future,
+                "args": (list(session.board.move_stack), session.board.size, algorithm, time_limit),
+            })
+            result = await future
+        finally:
+            session.searching = False
+
+        session.board.make_move(*result["move"])
+        return {**result, **session.state()}
+
+    async def run_searches(self):
+        """Take searches off the queue and run them in the process pool, one at a time."""
+        loop = asyncio.get_running_loop()
+        while True:
+            _, request = await self.queue.get()
+            future = request["future"]
+            if future.cancelled():
+                continue
+            try:
+                result = await loop.run_in_executor(self.executor, search_move, *request["args"])
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(ValueError(f"Search failed: {e}"))
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def close_idle_games(self):
+        """Periodically close the games nobody used for idle_timeout seconds."""
+        while True:
+            await asyncio.sleep(min(60.0, self.idle_timeout))
+            cutoff = time.time() - self.idle_timeout
+            for game_id in [game_id for game_id, session in self.games.items()
+                            if session.last_used < cutoff and not session.searching]:
+                del self.games[game_id]
+
+
+def finite(value, name: str) -> float:
+    """
+    Read a number from a request.
+
+    Args:
+        value: The value sent by the client
+        name: Name of the field, for the error message
+
+    Returns:
+        The value as a float
+
+    Raises:
+        ValueError: If the value is not a number or not finite (JSON allows NaN and Infinity)
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name} must be a number")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} must be finite")
+    return value
+
+
+_worker_ais = {}
+
+
+def search_move(moves: List[Tuple[int, int]], size: int, algorithm: str,
+                time_limit: float) -> dict:
+    """
+    Search a position in a worker process of the server.
+
+    The AI of each player and algorithm is created once per process and
+    reused, keeping its opening tables and evaluator caches warm.
+
+    Args:
+        moves: Moves of the game so far
+        size: The size of the board
+        algorithm: Search algorithm of the AI
+        time_limit: Time budget of the search in seconds
+
+    Returns:
+        Dictionary with the chosen move, nodes searched, completed depth and
+        search time
+    """
+    board = GomokuBoard(size)
+    for row, col in moves:
+        board.push((row, col))
+    key = (board.current_player, algorithm)
+    ai = _worker_ais.get(key)
+    if ai is None:
+        ai = GomokuAI(board.current_player, algorithm, verbose=False)
+        _worker_ais[key] = ai
+
+    start_time = time.time()
+    move = ai.get_move(board, time_limit)
+    return {
+        "move": list(move),
+        "nodes": ai.nodes_evaluated,
+        "depth": ai.completed_depth,
+        "search_time": time.time() - start_time,
+    }
+
+
+async def serve(host: str, port: int, **options):
+    """
+    Run a game server until it is cancelled.
+
+    Args:
+        host: Address to listen on
+        port: TCP port to listen on
+        options: GameServer constructor arguments
+    """
+    game_server = GameServer(**options)
+    server = await game_server.start(host, port)
+    print(f"Serving Gomoku games on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        game_server.close()
+
+
+def main():
+    """Run the game server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve Gomoku games over a local JSON socket API.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=2, help="Processes searching AI moves")
+    parser.add_argument("--max-games", type=int, default=10000, help="Most games hosted at once")
+    parser.add_argument("--max-time", type=float, default=5.0,
+                        help="Largest time budget of an AI move in seconds")
+    parser.add_argument("--default-time", type=float, default=1.0,
+                        help="Time budget of AI moves that do not give one")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, workers=args.workers, max_games=args.max_games,
+                          max_time=args.max_time, default_time=args.default_time))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import numpy as np
+from typing import Tuple, List, Iterator
+
+
+class _SparseRow:
+    """One row of a SparseGrid, so cells can be read and written as grid[row][col]."""
+
+    __slots__ = ("grid", "row")
+
+    def __init__(self, grid: 'SparseGrid', row: int):
+        self.grid = grid
+        self.row = row
+
+    def __getitem__(self, col: int) -> int:
+        return self.grid.stones.get((self.row, col), 0)
+
+    def __setitem__(self, col: int, player: int):
+        self.grid.set(self.row, col, player)
+
+
+class SparseGrid:
+    """
+    Cell grid that stores only the stones, in a dict keyed by (row, col).
+
+    Memory and copies scale with the number of stones rather than the board
+    area, so very large boards cost no more than small ones until they fill
+    up. Every cell missing from the dict is empty.
+    """
+
+    # Line directions: horizontal, vertical, diagonal \ and diagonal /
+    DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+    def __init__(self, size: int):
+        """
+        Initialize an empty grid.
+
+        Args:
+            size: The size of the board (size x size)
+        """
+        self.size = size
+        self.shape = (size, size)
+        self.stones = {}  # (row, col) -> player
+
+    def get(self, row: int, col: int) -> int:
+        """
+        Get the value of a cell.
+
+        Args:
+            row: Row index of the cell
+            col: Column index of the cell
+
+        Returns:
+            0 for an empty cell, otherwise the player owning the stone
+        """
+        return self.stones.get((row, col), 0)
+
+    def set(self, row: int, col: int, player: int):
+        """
+        Set the value of a cell.
+
+        Args:
+            row: Row index of the cell
+            col: Column index of the cell
+            player: 0 to clear the cell, otherwise the player owning the stone
+        """
+        if player:
+            self.stones[(row, col)] = player
+        else:
+            self.stones.pop((row, col), None)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            return self.stones.get(key, 0)
+        return _SparseRow(self, key)
+
+    def __setitem__(self, key: Tuple[int, int], player: int):
+        self.set(key[0], key[1], player)
+
+    def __iter__(self) -> Iterator[Tuple[Tuple[int, int], int]]:
+        """Iterate over the stones as ((row, col), player)."""
+        return iter(self.stones.items())
+
+    def __array__(self, dtype=None, copy=None):
+        grid = np.zeros(self.shape, dtype=dtype or int)
+        if self.stones:
+            rows, cols = zip(*self.stones)
+            grid[rows, cols] = list(self.stones.values())
+        return grid
+
+    def tolist(self) -> List[List[int]]:
+        """Get the cells as nested lists, like numpy.ndarray.tolist."""
+        grid = [[0] * self.size for _ in range(self.size)]
+        for (r, c), player in self.stones.items():
+            grid[r][c] = player
+        return grid
+
+    def copy(self) -> 'SparseGrid':
+        """Create a copy of the grid."""
+        clone = SparseGrid.__new__(SparseGrid)
+        clone.size = self.size
+        clone.shape = self.shape
+        clone.stones = dict(self.stones)
+        return clone
+
+    def five_through(self, row: int, col: int) -> bool:
+        """
+        Check if the stone on a cell is part of five in a row.
+
+        Args:
+            row: Row index of the stone
+            col: Column index of the stone
+
+        Returns:
+            True if the stone is part of five (or more) in a row
+        """
+        stones = self.stones
+        player = stones.get((row, col))
+        if not player:
+            return False
+        for dr, dc in self.DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                r, c = row + sign * dr, col + sign * dc
+                # Cells off the board are never in the dict, so no bounds checks
+                while count < 5 and stones.get((r, c)) == player:
+                    count += 1
+                    r, c = r + sign * dr, c + sign * dc
+            if count >= 5:
+                return True
+        return False
@@ -0,0 +1,124 @@
+from typing import Tuple, List, Optional
+from board import GomokuBoard, zobrist_keys
+
+# Number of symmetries of the square board (4 rotations, each optionally mirrored)
+SYMMETRIES = 8
+
+
+def transform(row: int, col: int, symmetry: int, size: int) -> Tuple[int, int]:
+    """
+    Map a cell through one of the board symmetries.
+
+    Symmetry 0 is the identity, 1-3 rotate by 90, 180 and 270 degrees, and
+    4-7 are the same rotations applied after mirroring the columns.
+
+    Args:
+        row, col: The cell
+        symmetry: Index of the symmetry (0-7)
+        size: The size of the board
+
+    Returns:
+        The transformed (row, col)
+    """
+    last = size - 1
+    if symmetry >= 4:
+        col = last - col
+    for _ in range(symmetry % 4):
+        row, col = col, last - row  # Rotate 90 degrees clockwise
+    return (row, col)
+
+
+def inverse(symmetry: int) -> int:
+    """Get the symmetry that undoes another one."""
+    if symmetry >= 4:
+        return symmetry  # A mirrored rotation is its own inverse
+    return (4 - symmetry) % 4
+
+
+def transform_move(move: Optional[Tuple[int, int]], symmetry: int,
+                   size: int) -> Optional[Tuple[int, int]]:
+    """Map a move through a symmetry like transform, passing None through."""
+    if move is None or symmetry == 0:
+        return move
+    return transform(move[0], move[1], symmetry, size)
+
+
+def symmetric_hashes(board: GomokuBoard) -> List[int]:
+    """
+    Get the Zobrist hash of the position under each of the 8 symmetries.
+
+    Args:
+        board: The position
+
+    Returns:
+        List of 8 hashes; index 0 equals board.hash
+    """
+    keys = zobrist_keys(board.size)
+    hashes = [0] * SYMMETRIES
+    for row, col, player in board.stones():
+        player_keys = keys[player - 1]
+        for symmetry in range(SYMMETRIES):
+            r, c = transform(row, col, symmetry, board.size)
+            hashes[symmetry] ^= player_keys[r * board.size + c]
+    return hashes
+
+
+def canonical_hash(board: GomokuBoard) -> Tuple[int, int]:
+    """
+    Get the hash shared by all 8 symmetric versions of a position.
+
+    Args:
+        board: The position
+
+    Returns:
+        The smallest of the symmetric hashes and the symmetry that produces it
+    """
+    hashes = symmetric_hashes(board)
+    symmetry = min(range(SYMMETRIES), key=hashes.__getitem__)
+    return hashes[symmetry], symmetry
+
+
+def symmetry_group(board: GomokuBoard) -> List[int]:
+    """
+    Find the symmetries that leave a position unchanged.
+
+    Args:
+        board: The position
+
+    Returns:
+        The symmetries that map every stone onto a stone of the same player,
+        always including the identity 0
+    """
+    placed = board.stones()
+    grid = board.board
+    group = [0]
+    for symmetry in range(1, SYMMETRIES):
+        # Most positions fail on the first stone, so this is cheap off the opening
+        if all(grid[r][c] == player for r, c, player in
+               ((*transform(row, col, symmetry, board.size), player) for row, col, player in placed)):
+            group.append(symmetry)
+    return group
+
+
+def unique_moves(moves: List[Tuple[int, int]], group: List[int], size: int) -> List[Tuple[int, int]]:
+    """
+    Drop the moves that lead to the same position as an earlier move, up to symmetry.
+
+    Args:
+        moves: Candidate moves
+        group: Symmetries of the position (see symmetry_group)
+        size: The size of the board
+
+    Returns:
+        The first move of every set of equivalent moves, in the original order
+    """
+    if len(group) == 1:
+        return moves
+    seen = set()
+    unique = []
+    for row, col in moves:
+        if (row, col) in seen:
+            continue
+        unique.append((row, col))
+        seen.update(transform(row, col, symmetry, size) for symmetry in group)
+    return unique
@@ -0,0 +1,80 @@
+import random
+import re
+import pytest
+from board import GomokuBoard
+from evaluator import PatternEvaluator, pattern_score
+
+
+def random_game(board: GomokuBoard, rng: random.Random, max_moves: int):
+    """Play random candidate moves until the game ends or max_moves were played."""
+    for _ in range(max_moves):
+        if board.game_over:
+            return
+        board.push(rng.choice(board.get_neighbor_moves(board.candidate_distance)))
+
+
+def line_strings(board: GomokuBoard, player: int) -> list:
+    """Get every line of the board as a string of X (player), O (opponent) and ., padded with #."""
+    grid = board.board.tolist()
+    symbols = {0: ".", player: "X", 3 - player: "O"}
+    return ["#" + "".join(symbols[grid[row][col]] for row, col in line) + "#"
+            for family in PatternEvaluator(board.size).lines for line in family]
+
+
+def open_runs(board: GomokuBoard, player: int, length: int) -> int:
+    """Count the runs the pattern evaluator scores as open (both ends empty) runs of a length."""
+    total = 0
+    for line in line_strings(board, player):
+        for match in re.finditer("X+", line):
+            open_ends = (line[match.start() - 1] == ".") + (line[match.end()] == ".")
+            if open_ends == 2 and pattern_score(len(match.group()), open_ends) == pattern_score(length, 2):
+                total += 1
+    return total
+
+
+def open_threes(board: GomokuBoard, player: int) -> int:
+    """Count threes that become an open four with one more stone, by scanning line strings."""
+    total = 0
+    for line in line_strings(board, player):
+        for start in range(len(line)):
+            window = line[start:start + 7]
+            if re.match(r"\.XXX\.\.", window) and line[start - 1] != "X":
+                total += 1
+            if re.match(r"\.\.XXX\.", window) and line[start + 6:start + 7] != "X":
+                # ..XXX.. is also matched as .XXX.. one cell further
+                total += not re.match(r"\.\.XXX\.\.", window)
+            total += bool(re.match(r"\.XX\.X\.|\.X\.XX\.", window))
+    return total
+
+
+@pytest.mark.parametrize("size", [9, 15, 19])
+def test_open_fours_match_pattern_evaluator(size):
+    rng = random.Random(size)
+    for _ in range(150):
+        board = GomokuBoard(size, backend="bitboard")
+        random_game(board, rng, rng.randrange(1, size * size // 2))
+        for player in (1, 2):
+            assert board.board.count_open_fours(player) == open_runs(board, player, 4)
+
+
+@pytest.mark.parametrize("size", [9, 15, 19])
+def test_open_threes_match_line_scan(size):
+    rng = random.Random(size)
+    for _ in range(150):
+        board = GomokuBoard(size, backend="bitboard")
+        random_game(board, rng, rng.randrange(1, size * size // 2))
+        for player in (1, 2):
+            assert board.board.count_open_threes(player) == open_threes(board, player)
+
+
+@pytest.mark.parametrize("row, threes", [
+    ("..XXX..", 1), (".XX.X.", 1), (".X.XX.", 1), ("OXXX...", 0), ("O.XXX..", 1),
+    # already fours: one stone in the gap makes five
+    ("X.XXX..", 0), ("..XXX.X", 0),
+])
+def test_open_three_shapes(row, threes):
+    board = GomokuBoard(15, backend="bitboard")
+    for col, cell in enumerate(row, start=4):
+        if cell != ".":
+            board.board.set(7, col, 1 if cell == "X" else 2)
+    assert board.board.count_open_threes(1) == threes
@@ -0,0 +1,97 @@
+import random
+import numpy as np
+import pytest
+from board import GomokuBoard
+from evaluator import BatchEvaluator
+from player import GomokuAI
+
+
+def random_game(board: GomokuBoard, rng: random.Random, max_moves: int):
+    """Play random candidate moves until the game ends or max_moves were played."""
+    for _ in range(max_moves):
+        if board.game_over:
+            return
+        board.push(rng.choice(board.get_neighbor_moves(board.candidate_distance)))
+
+
+def snapshot(board: GomokuBoard) -> tuple:
+    """Get the incrementally maintained state of a board."""
+    evaluator = board.evaluator
+    return (board.hash, board.stone_count, board.current_player, board.game_over, board.winner,
+            dict(board.neighbor_counts), set(board.candidates), evaluator.score,
+            [list(codes) for codes in evaluator.codes],
+            [list(scores) for scores in evaluator.line_scores])
+
+
+@pytest.mark.parametrize("backend", GomokuBoard.BACKENDS)
+def test_incremental_score_matches_full_scan(backend):
+    rng = random.Random(2)
+    for game in range(40):
+        board = GomokuBoard(rng.choice([9, 15, 19]), backend=backend)
+        ais = [GomokuAI(player, verbose=False) for player in (1, 2)]
+        for _ in range(rng.randrange(1, 60)):
+            if board.game_over:
+                break
+            board.push(rng.choice(board.get_neighbor_moves(2)))
+            for ai in ais:
+                assert ai.evaluate(board) == ai.evaluate_full_scan(board)
+
+
+@pytest.mark.parametrize("backend", GomokuBoard.BACKENDS)
+def test_push_pop_restores_state(backend):
+    rng = random.Random(5)
+    for game in range(30):
+        board = GomokuBoard(15, backend=backend)
+        random_game(board, rng, rng.randrange(0, 30))
+        before = snapshot(board)
+        grid = board.board.tolist()
+        played = 0
+        for _ in range(rng.randrange(1, 12)):
+            if board.game_over:
+                break
+            board.push(rng.choice(board.get_neighbor_moves(2)))
+            played += 1
+        for _ in range(played):
+            board.pop()
+        assert snapshot(board) == before
+        assert board.board.tolist() == grid
+
+
+def test_incremental_hash_matches_fresh_board():
+    rng = random.Random(9)
+    board = GomokuBoard(15)
+    random_game(board, rng, 40)
+    fresh = GomokuBoard(15)
+    for move in board.move_stack:
+        fresh.push(move)
+    assert snapshot(fresh) == snapshot(board)
+
+
+def test_batch_scores_match_incremental_score():
+    rng = random.Random(13)
+    evaluators = {}
+    for _ in range(300):
+        board = GomokuBoard(rng.choice([9, 15]))
+        random_game(board, rng, rng.randrange(0, 50))
+        evaluator = evaluators.setdefault(board.size, BatchEvaluator(board.size))
+        scores = evaluator.scores(np.array(board.board)[np.newaxis])
+        assert scores.tolist() == [board.evaluator.score]
+
+
+@pytest.mark.parametrize("algorithm,depth", [("alphabeta", 0), ("minimax", 1),
+                                             ("alphabeta", 1), ("alphabeta", 2)])
+def test_batched_leaves_match_search(algorithm, depth):
+    rng = random.Random(17)
+    for _ in range(4):
+        board = GomokuBoard(rng.choice([9, 19]))
+        random_game(board, rng, rng.randrange(1, 12))
+        if board.game_over:
+            continue
+        # Searching reorders the board's candidate set, so both get the same list
+        moves = board.get_neighbor_moves(2)
+        results = []
+        for batch_leaves in (False, True):
+            ai = GomokuAI(board.current_player, algorithm, depth, verbose=False,
+                          threat_search=False, batch_leaves=batch_leaves)
+            results.append(ai.search_root(board, list(moves), depth))
+        assert results[0] == results[1]
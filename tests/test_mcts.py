@@ -0,0 +1,47 @@
+import pytest
+from board import GomokuBoard
+from mcts import MCTS
+from player import GomokuAI
+from test_search import play, FOUR_TO_BLOCK, FOUR_TO_COMPLETE, MIDGAME
+
+
+@pytest.mark.parametrize("moves", [FOUR_TO_COMPLETE, FOUR_TO_BLOCK])
+def test_plays_the_five_cell(moves):
+    board = play(moves)
+    ai = GomokuAI(board.current_player, "mcts", verbose=False, threat_search=False, playouts=300)
+    assert ai.get_move(board) == (7, 8)
+
+
+def test_board_is_left_unchanged():
+    board = play(MIDGAME)
+    before = (board.hash, board.board.tolist(), set(board.candidates),
+              dict(board.neighbor_counts), list(board.move_stack), board.current_player)
+    mcts = MCTS(seed=1)
+    mcts.search(board, 200)
+    after = (board.hash, board.board.tolist(), set(board.candidates),
+             dict(board.neighbor_counts), list(board.move_stack), board.current_player)
+    assert after == before
+    assert mcts.playouts == 200
+    assert sum(visits for _, visits, _ in mcts.root_stats()) == 200
+
+
+def test_tree_is_reused_after_the_expected_moves():
+    board = play(MIDGAME)
+    mcts = MCTS(seed=1)
+    mcts.search(board, 300)
+    line = mcts.principal_variation()[:2]
+    node = mcts.root
+    for move in line:
+        node = next(child for child in node.children if child.move == move)
+        board.push(move)
+    root = mcts.search(board, 50, reuse=True)
+    assert root is node and root.visits > 50
+    # Moves that left the tree start a new one
+    board.pop()
+    board.push(next(move for move in sorted(board.candidates) if move != line[1]))
+    assert mcts.search(board, 50, reuse=True).visits == 50
+
+
+def test_needs_a_budget():
+    with pytest.raises(ValueError):
+        MCTS().search(GomokuBoard(15))
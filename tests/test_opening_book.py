@@ -0,0 +1,72 @@
+import json
+import pytest
+from board import GomokuBoard
+from opening_book import OpeningBook, build_book
+from player import GomokuAI
+from records import RecordWriter
+from symmetry import transform, SYMMETRIES
+
+# A line won by black in most games, and a rarer reply won by white
+MAIN_LINE = [(7, 7), (7, 8), (8, 10), (9, 9)]
+SIDE_LINE = [(7, 7), (6, 6), (8, 8), (9, 9)]
+
+
+def play(moves, size: int = 15) -> GomokuBoard:
+    """Set up a position by playing moves, alternating players from player 1."""
+    board = GomokuBoard(size)
+    for move in moves:
+        board.push(move)
+    return board
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    """Build a book from a JSONL log and a binary record file of the two lines."""
+    log = tmp_path / "games.jsonl"
+    with open(log, "w") as f:
+        for _ in range(8):
+            f.write(json.dumps({"size": 15, "moves": MAIN_LINE, "result": "1-0"}) + "\n")
+    records = tmp_path / "games.gmk"
+    with RecordWriter(records) as writer:
+        for _ in range(4):
+            writer.write({"size": 15, "moves": MAIN_LINE, "result": "1-0"})
+        for _ in range(3):
+            writer.write({"size": 15, "moves": SIDE_LINE, "result": "0-1"})
+        # Games on other boards are left out
+        writer.write({"size": 19, "moves": MAIN_LINE, "result": "0-1"})
+    path = tmp_path / "book.bin"
+    assert build_book([str(log), str(records)], str(path), max_plies=4) == 4
+    return str(path)
+
+
+def test_lookup(book_path):
+    book = OpeningBook(book_path)
+    assert book.lookup(GomokuBoard(15)) == [((7, 7), 15, 24 / 30)]
+    # The side line has fewer than MIN_BOOK_GAMES games and is not kept
+    assert book.lookup(play(MAIN_LINE[:1])) == [((7, 8), 12, 0.0)]
+    assert book.lookup(play(SIDE_LINE[:2])) == []
+    assert book.lookup(GomokuBoard(19)) == []
+
+
+@pytest.mark.parametrize("symmetry", range(SYMMETRIES))
+def test_symmetric_lookup(book_path, symmetry):
+    book = OpeningBook(book_path)
+    board = play([transform(row, col, symmetry, 15) for row, col in MAIN_LINE[:3]])
+    assert book.choose(board) == transform(*MAIN_LINE[3], symmetry, 15)
+
+
+def test_choose_needs_enough_games(tmp_path, book_path):
+    # Keep every move in the book, so only choose filters them
+    path = tmp_path / "small.bin"
+    build_book([str(tmp_path / "games.gmk")], str(path), max_plies=4, min_games=1)
+    book = OpeningBook(str(path))
+    assert book.lookup(play(SIDE_LINE[:2]))
+    assert book.choose(play(SIDE_LINE[:2])) is None
+    assert book.choose(play(SIDE_LINE[:2]), min_games=3) == (8, 8)
+
+
+def test_ai_plays_book_moves(book_path):
+    board = play(MAIN_LINE[:1])
+    ai = GomokuAI(2, "alphabeta", 2, verbose=False, book=book_path)
+    assert ai.get_move(board) == (7, 8)
+    assert ai.book_move == (7, 8)
@@ -0,0 +1,62 @@
+import random
+import pytest
+from records import RecordWriter, read_records, replay, is_record_file, RESULTS
+
+
+def random_moves(size: int, count: int, rng: random.Random) -> list:
+    """Pick distinct random cells of a board."""
+    return rng.sample([(row, col) for row in range(size) for col in range(size)], count)
+
+
+@pytest.mark.parametrize("size", [9, 15, 16, 19, 40])
+def test_round_trip(tmp_path, size):
+    rng = random.Random(size)
+    path = tmp_path / "games.gmk"
+    games = [{"size": size, "black": "alphabeta-3", "white": "mcts 1000 éè",
+              "result": RESULTS[i % len(RESULTS)], "moves": random_moves(size, rng.randrange(60), rng)}
+             for i in range(20)]
+    with RecordWriter(path) as writer:
+        for game in games[:10]:
+            writer.write(game)
+    # A second writer appends to the same file
+    with RecordWriter(path) as writer:
+        for game in games[10:]:
+            writer.write(game)
+    assert is_record_file(path)
+    assert list(read_records(path)) == games
+
+
+def test_long_names_are_cut_on_a_character_boundary(tmp_path):
+    path = tmp_path / "games.gmk"
+    with RecordWriter(path) as writer:
+        writer.write({"size": 15, "black": "é" * 200, "white": None, "result": "*", "moves": []})
+    game, = read_records(path)
+    assert game["black"] == "é" * 127
+    assert game["white"] == ""
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "games.txt"
+    path.write_text("not a record file")
+    with pytest.raises(ValueError):
+        RecordWriter(path)
+    with pytest.raises(ValueError):
+        list(read_records(path))
+
+
+def test_rejects_truncated_records(tmp_path):
+    path = tmp_path / "games.gmk"
+    with RecordWriter(path) as writer:
+        writer.write({"size": 15, "black": "a", "white": "b", "result": "1-0",
+                      "moves": [(7, 7), (7, 8), (8, 8)]})
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError):
+        list(read_records(path))
+
+
+def test_replay():
+    moves = [(7, 7), (7, 8), (8, 8), (6, 6)]
+    positions = [(board.stone_count, move) for board, move in replay({"size": 15, "moves": moves})]
+    assert positions == list(enumerate(moves))
+    with pytest.raises(ValueError):
+        list(replay({"size": 15, "moves": moves + [(7, 7)]}))
@@ -0,0 +1,96 @@
+import pytest
+from board import GomokuBoard
+from player import GomokuAI
+
+
+def play(moves, size: int = 15) -> GomokuBoard:
+    """Set up a position by playing moves, alternating players from player 1."""
+    board = GomokuBoard(size)
+    for move in moves:
+        board.push(move)
+    return board
+
+
+# Player 1 has a four on row 7, blocked at (7, 3); player 2 must play (7, 8)
+FOUR_TO_BLOCK = [(7, 4), (7, 3), (7, 5), (0, 0), (7, 6), (0, 14), (7, 7)]
+# The same four with player 1 to move, who wins at (7, 8)
+FOUR_TO_COMPLETE = FOUR_TO_BLOCK + [(14, 0)]
+
+
+@pytest.mark.parametrize("algorithm", ["minimax", "alphabeta", "pvs"])
+def test_timed_search_blocks_a_four(algorithm):
+    board = play(FOUR_TO_BLOCK)
+    ai = GomokuAI(board.current_player, algorithm, 2, verbose=False, threat_search=False)
+    assert ai.get_move(board, 1.0) == (7, 8)
+
+
+@pytest.mark.parametrize("algorithm", ["alphabeta", "pvs"])
+def test_timed_search_takes_a_win(algorithm):
+    board = play(FOUR_TO_COMPLETE)
+    ai = GomokuAI(board.current_player, algorithm, 2, verbose=False, threat_search=False)
+    assert ai.get_move(board, 1.0) == (7, 8)
+    assert ai.completed_depth >= 1
+
+
+# Midgame position from the benchmark, with player 2 to move
+MIDGAME = [(7, 7), (7, 8), (8, 7), (6, 7), (9, 7), (8, 8), (6, 8)]
+
+
+@pytest.mark.parametrize("algorithm", ["alphabeta", "pvs"])
+def test_parallel_search_matches_serial(algorithm):
+    board = play(MIDGAME)
+    serial = GomokuAI(board.current_player, algorithm, 1, verbose=False, threat_search=False)
+    parallel = GomokuAI(board.current_player, algorithm, 1, verbose=False, threat_search=False,
+                        workers=2, measure_speedup=True)
+    try:
+        moves = board.get_neighbor_moves(2)
+        assert (parallel.search_root(board, list(moves), 1)[1]
+                == serial.search_root(board, list(moves), 1)[1])
+        parallel.get_move(board)
+        assert parallel.search_stats()["parallel_speedup"] > 0
+    finally:
+        parallel.close()
+
+
+# Positions after the opening, with either player to move
+POSITIONS = [MIDGAME, MIDGAME + [(5, 9)], FOUR_TO_BLOCK[:5], [(7, 7), (8, 8), (7, 9), (6, 8)]]
+
+
+@pytest.mark.parametrize("moves", POSITIONS)
+def test_pvs_matches_alphabeta_score(moves):
+    board = play(moves)
+    for depth in range(3):
+        scores = []
+        for algorithm in ("alphabeta", "pvs"):
+            ai = GomokuAI(board.current_player, algorithm, depth, verbose=False, threat_search=False)
+            ai.reset_search()
+            scores.append(ai.search_root(board, board.get_neighbor_moves(2), depth)[1])
+        assert scores[0] == scores[1]
+
+
+@pytest.mark.parametrize("moves", POSITIONS)
+def test_aspiration_search_matches_full_window(moves):
+    board = play(moves)
+    ai = GomokuAI(board.current_player, "pvs", 2, verbose=False, threat_search=False)
+    ai.reset_search()
+    score = ai.search_root(board, board.get_neighbor_moves(2), 2)[1]
+    # Guesses far off on either side make the first windows fail
+    for guess in (score - 3000, score + 3000):
+        ai.reset_search()
+        assert ai.aspiration_search(board, board.get_neighbor_moves(2), 2, guess)[1] == score
+        assert ai.aspiration_failures > 0
+
+
+@pytest.mark.parametrize("algorithm", ["alphabeta", "pvs"])
+@pytest.mark.parametrize("moves", POSITIONS)
+def test_table_bounds_do_not_change_scores(algorithm, moves):
+    board = play(moves)
+    exact = GomokuAI(board.current_player, algorithm, 2, verbose=False, threat_search=False, tt_size=0)
+    expected = exact.search_root(board, board.get_neighbor_moves(2), 2)[1]
+    # Null-window searches around the score fill the table with bounds, which
+    # a later full-window search must only use to narrow its windows
+    ai = GomokuAI(board.current_player, algorithm, 2, verbose=False, threat_search=False,
+                  persistent=True)
+    for alpha in (expected - 100, expected, expected + 100):
+        ai.search_root(board, board.get_neighbor_moves(2), 2, alpha, alpha + 1)
+    assert ai.search_root(board, board.get_neighbor_moves(2), 2)[1] == expected
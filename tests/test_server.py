@@ -0,0 +1,102 @@
+import asyncio
+import json
+import pytest
+from server import GameServer
+
+
+async def exchange(lines: list) -> list:
+    """Send request lines to a fresh server and read one response per line."""
+    game_server = GameServer(workers=1)
+    server = await game_server.start(port=0)
+    try:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        # One request at a time, so every request sees the games made before it
+        for line in lines:
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+            responses.append(json.loads(await asyncio.wait_for(reader.readline(), 10)))
+        # Wait for the server to close its end, so the connection handler has finished
+        writer.write_eof()
+        assert await asyncio.wait_for(reader.read(), 10) == b""
+        writer.close()
+        return responses
+    finally:
+        server.close()
+        await server.wait_closed()
+        game_server.close()
+
+
+def request(op: str, **fields) -> str:
+    """Write a request line."""
+    return json.dumps({"op": op, "id": 7, **fields})
+
+
+def test_game_flow():
+    new, moved, state = asyncio.run(exchange([
+        request("new_game", size=9),
+        request("move", game=1, row=4, col=4),
+        request("state", game=1),
+    ]))
+    assert new["ok"] and new["game"] == 1 and new["size"] == 9 and new["id"] == 7
+    assert moved["ok"] and moved["moves"] == [[4, 4]]
+    assert state["current_player"] == 2
+
+
+@pytest.mark.parametrize("line", [
+    "{not json",
+    "[1, 2]",
+    request("fly"),
+    request("new_game", size=25),
+    request("new_game", size="15"),
+    request("state", game=99),
+])
+def test_bad_requests_get_an_error(line):
+    response, stats = asyncio.run(exchange([line, request("stats")]))
+    assert response["ok"] is False and response["error"]
+    # The connection keeps working after a bad request
+    assert stats["ok"]
+
+
+@pytest.mark.parametrize("fields", [
+    {"row": 9, "col": 0}, {"row": -1, "col": 3}, {"row": 1.5, "col": 3},
+    {"row": "NaN", "col": 3}, {"row": 4, "col": 4},
+])
+def test_invalid_moves_are_rejected(fields):
+    lines = [request("new_game", size=9), request("move", game=1, row=4, col=4),
+             request("move", game=1, **fields)]
+    if fields["row"] == "NaN":
+        lines[-1] = lines[-1].replace('"NaN"', "NaN")
+    response = asyncio.run(exchange(lines))[-1]
+    assert response["ok"] is False and response["id"] == 7
+
+
+@pytest.mark.parametrize("budget", ["NaN", "Infinity", "-Infinity", "0", "-1", '"1"'])
+def test_bad_time_budgets_are_rejected(budget):
+    ai_move = request("ai_move", game=1, time=0).replace('"time": 0', f'"time": {budget}')
+    _, response, stats = asyncio.run(exchange([request("new_game"), ai_move, request("stats")]))
+    assert response["ok"] is False
+    assert stats["queued_searches"] == 0
+
+
+class ClosedWriter:
+    """Stream writer of a client that has disconnected."""
+
+    def __init__(self):
+        self.closed = False
+
+    def write(self, data: bytes):
+        pass
+
+    async def drain(self):
+        raise ConnectionResetError
+
+    def close(self):
+        self.closed = True
+
+
+def test_response_to_a_closed_connection():
+    writer = ClosedWriter()
+    asyncio.run(GameServer().respond(1, request("stats").encode(), writer))
+    assert writer.closed
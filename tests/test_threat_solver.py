@@ -0,0 +1,64 @@
+from board import GomokuBoard
+from threat_solver import solve
+
+
+def play(moves, size: int = 15) -> GomokuBoard:
+    """Set up a position by playing moves, alternating players from player 1."""
+    board = GomokuBoard(size)
+    for move in moves:
+        board.push(move)
+    return board
+
+
+def wins(board: GomokuBoard, line) -> bool:
+    """Check that playing out a solver line ends in a win for the player to move."""
+    attacker = board.current_player
+    board = play(board.move_stack, board.size)
+    for move in line:
+        assert not board.game_over
+        board.push(move)
+    return board.winner == attacker
+
+
+# Player 1 has a three on row 7 blocked at (7, 3) and a three on column 8
+# blocked at (3, 8); (7, 8) makes two fours at once
+DOUBLE_FOUR = [(7, 4), (7, 3), (7, 5), (3, 8), (7, 6), (0, 0),
+               (4, 8), (0, 14), (5, 8), (14, 0), (6, 8), (14, 14)]
+# Player 1 has open twos on row 7 and column 8; (7, 8) makes two open threes
+DOUBLE_THREE = [(7, 6), (0, 0), (7, 7), (0, 14), (5, 8), (14, 0), (6, 8), (14, 14)]
+# The same double three, with an open three for player 2 on row 11
+DOUBLE_THREE_AGAINST_THREE = [(7, 6), (11, 2), (7, 7), (11, 3), (5, 8), (11, 4), (6, 8), (0, 0)]
+
+
+def test_vcf_win():
+    board = play(DOUBLE_FOUR)
+    line = solve(board, vct_depth=0)
+    assert line is not None and line[0] == (7, 8)
+    assert wins(board, line)
+
+
+def test_vct_win():
+    board = play(DOUBLE_THREE)
+    assert solve(board, vct_depth=0) is None
+    line = solve(board)
+    assert line is not None
+    assert wins(board, line)
+
+
+def test_no_win():
+    assert solve(play([(7, 7), (8, 8)])) is None
+
+
+def test_counter_four_refutes_a_three():
+    # Against either three player 2 makes an open four on row 11 first
+    assert solve(play(DOUBLE_THREE_AGAINST_THREE)) is None
+
+
+def test_board_is_left_unchanged():
+    board = play(DOUBLE_THREE)
+    before = (board.hash, board.board.tolist(), set(board.candidates),
+              dict(board.neighbor_counts), list(board.move_stack), board.current_player)
+    assert solve(board) is not None
+    after = (board.hash, board.board.tolist(), set(board.candidates),
+             dict(board.neighbor_counts), list(board.move_stack), board.current_player)
+    assert after == before
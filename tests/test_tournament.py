@@ -0,0 +1,14 @@
+from tournament import move_name, game_record
+
+
+def test_move_names():
+    assert move_name(7, 7) == "h8"
+    assert move_name(25, 25, 26) == "z26"
+    # Boards wider than the alphabet use numbers for every move
+    assert move_name(7, 7, 27) == "8,8"
+    assert move_name(2, 30, 40) == "31,3"
+
+
+def test_game_record():
+    assert game_record([(7, 7), (8, 8), (6, 6)], "1-0") == "1. h8 i9 2. g7 1-0"
+    assert game_record([(50, 50), (51, 49)], "*", 100) == "1. 51,51 50,52 *"
@@ -0,0 +1,53 @@
+import pytest
+from transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+def test_store_and_probe():
+    table = TranspositionTable(16)
+    assert table.probe(5) is None
+    table.store(5, 3, 120, LOWER_BOUND, (7, 7))
+    entry = table.probe(5)
+    assert (entry.depth, entry.score, entry.flag, entry.best_move) == (3, 120, LOWER_BOUND, (7, 7))
+    # Another position in the same slot is a collision, not a hit
+    assert table.probe(21) is None
+    assert (table.hits, table.misses, table.collisions) == (1, 1, 1)
+
+
+def test_same_position_is_overwritten():
+    table = TranspositionTable(16)
+    table.store(5, 4, 300, LOWER_BOUND, (7, 7))
+    table.store(5, 2, 250, UPPER_BOUND, (7, 8))
+    entry = table.probe(5)
+    assert (entry.depth, entry.score, entry.flag, entry.best_move) == (2, 250, UPPER_BOUND, (7, 8))
+
+
+@pytest.mark.parametrize("replacement, kept", [("depth", 5), ("always", 21)])
+def test_replacement_policy(replacement, kept):
+    table = TranspositionTable(16, replacement)
+    table.store(5, 4, 300, EXACT, None)
+    table.store(21, 2, 100, EXACT, None)
+    assert table.probe(kept) is not None
+
+
+def test_older_searches_are_replaced_and_evicted():
+    table = TranspositionTable(16)
+    table.store(5, 4, 300, EXACT, None)
+    table.new_search(2)
+    # A deeper entry from an earlier search does not keep its slot
+    table.store(21, 2, 100, EXACT, None)
+    assert table.probe(21) is not None
+    table.store(6, 1, 0, EXACT, None)
+    table.new_search(2)
+    table.store(21, 2, 100, EXACT, None)
+    table.new_search(2)
+    table.new_search(2)
+    # Only the entry stored again in the last two searches is left
+    assert table.probe(6) is None
+    assert table.probe(21) is not None
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TranspositionTable(0)
+    with pytest.raises(ValueError):
+        TranspositionTable(16, "oldest")
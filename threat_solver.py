@@ -0,0 +1,325 @@
+from typing import Tuple, List, Optional, Set
+from board import GomokuBoard, neighborhoods
+
+# Width of the off-board border around the solver's flat cell list
+PADDING = 5
+
+
+class ThreatSolver:
+    """
+    Threat-space search for forced wins.
+
+    Only the attacker's threats are searched: fours (VCF, victory by
+    continuous fours) and open threes (VCT, victory by continuous threats).
+    The defender only tries the replies that stop the threat, plus moves
+    that make a four of their own against a three, so forcing lines many
+    plies deep are found without full-width search.
+    """
+
+    def __init__(self, vcf_depth: int = 12, vct_depth: int = 4, max_nodes: int = 5000):
+        """
+        Initialize the solver.
+
+        Args:
+            vcf_depth: Maximum number of attacker fours in a VCF sequence
+            vct_depth: Maximum number of attacker threats in a VCT sequence (0 disables VCT)
+            max_nodes: Node budget per solve call; the search gives up once it is spent
+        """
+        self.vcf_depth = vcf_depth
+        self.vct_depth = vct_depth
+        self.max_nodes = max_nodes
+        self.nodes = 0
+        self.vct = False
+
+    def solve(self, board: GomokuBoard, player: Optional[int] = None) -> Optional[List[Tuple[int, int]]]:
+        """
+        Search for a forced win, trying VCF before the wider VCT search.
+
+        Args:
+            board: The current game board (left unchanged)
+            player: Attacking player, who must be the one to move (defaults to
+                    board.current_player)
+
+        Returns:
+            The winning line as alternating attacker and defender moves, starting
+            with the attacker's move, or None if no forced win was found
+        """
+        self.nodes = 0
+        if board.game_over or not board.candidates:
+            return None
+
+        self.size = board.size
+        self.attacker = player or board.current_player
+        self.defender = 3 - self.attacker
+        self.zobrist = board.zobrist
+        self.hash = board.hash
+        self.neighborhoods = neighborhoods(board.size, 2)
+        self.counts = dict(board.neighbor_counts)
+        self.candidates = set(board.candidates)
+
+        # Flat copy of the board with a border of PADDING off-board cells (-1),
+        # so the cells along a line are a plain slice without bounds checks
+        self.width = board.size + 2 * PADDING
+        self.steps = [1, self.width, self.width + 1, self.width - 1]
+        self.cells = [-1] * (self.width * self.width)
+        empty_row = [0] * board.size
+        for r in range(board.size):
+            start = self.index(r, 0)
+            self.cells[start:start + board.size] = empty_row
+        for r, c, player in board.stones():
+            self.cells[self.index(r, c)] = player
+
+        # Win immediately if possible
+        wins = self._winning_cells(self.attacker)
+        if wins:
+            return [wins[0]]
+        blocks = set(self._winning_cells(self.defender))
+
+        for vct, depth in ((False, self.vcf_depth), (True, self.vct_depth)):
+            if depth <= 0:
+                continue
+            self.vct = vct
+            self.failed = {}  # (position hash, open blocks) -> depth at which no win was found
+            line = self._attack(depth, blocks)
+            if line is not None:
+                return line
+        return None
+
+    def index(self, row: int, col: int) -> int:
+        """Get the index of a board cell in the padded flat cell list."""
+        return (row + PADDING) * self.width + col + PADDING
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        """Get the board cell of an index in the padded flat cell list."""
+        row, col = divmod(index, self.width)
+        return (row - PADDING, col - PADDING)
+
+    def _place(self, row: int, col: int, player: int):
+        """Put a stone on the solver's board."""
+        self.cells[self.index(row, col)] = player
+        self.hash ^= self.zobrist[player - 1][row * self.size + col]
+        for cell in self.neighborhoods[row * self.size + col]:
+            count = self.counts.get(cell, 0) + 1
+            self.counts[cell] = count
+            if count == 1:
+                self.candidates.add(cell)
+        self.candidates.discard((row, col))
+
+    def _remove(self, row: int, col: int):
+        """Take a stone off the solver's board."""
+        index = self.index(row, col)
+        player = self.cells[index]
+        self.cells[index] = 0
+        self.hash ^= self.zobrist[player - 1][row * self.size + col]
+        for cell in self.neighborhoods[row * self.size + col]:
+            count = self.counts[cell] - 1
+            if count:
+                self.counts[cell] = count
+            else:
+                del self.counts[cell]
+                self.candidates.discard(cell)
+        if (row, col) in self.counts:
+            self.candidates.add((row, col))
+
+    def five_points(self, row: int, col: int, player: int) -> Set[Tuple[int, int]]:
+        """
+        Find the empty cells that would complete five through a player's stone.
+
+        Args:
+            row, col: Cell of the player's stone
+            player: Owner of the stone
+
+        Returns:
+            Set of cells where the player would make five in a row
+        """
+        points = set()
+        center = self.index(row, col)
+        for step in self.steps:
+            first = center - 4 * step
+            values = self.cells[first:center + 4 * step + 1:step]
+            if values.count(player) < 4:
+                continue
+            for start in range(5):
+                window = values[start:start + 5]
+                if window.count(player) == 4 and window.count(0) == 1:
+                    points.add(self.cell(first + (start + window.index(0)) * step))
+        return points
+
+    def three_defenses(self, row: int, col: int, player: int) -> Set[Tuple[int, int]]:
+        """
+        Find the cells that stop the open threes through a player's stone.
+
+        An open three is a six-cell window with empty ends and three of the
+        player's stones and one empty cell inside, so one more stone makes a
+        straight four with both ends open.
+
+        Args:
+            row, col: Cell of the player's stone
+            player: Owner of the stone
+
+        Returns:
+            Set of defending cells (empty if the stone makes no open three)
+        """
+        defenses = set()
+        center = self.index(row, col)
+        for step in self.steps:
+            first = center - 5 * step
+            values = self.cells[first:center + 5 * step + 1:step]
+            if values.count(player) < 3:
+                continue
+            for start in range(6):
+                inner = values[start + 1:start + 5]
+                if (values[start] == 0 and values[start + 5] == 0
+                        and inner.count(player) == 3 and inner.count(0) == 1):
+                    defenses.update(self.cell(first + (start + k) * step)
+                                    for k in range(6) if values[start + k] == 0)
+        return defenses
+
+    def makes_five(self, row: int, col: int, player: int) -> bool:
+        """Check if a player placing a stone on an empty cell makes five in a row."""
+        center = self.index(row, col)
+        cells = self.cells
+        for step in self.steps:
+            count = 1
+            index = center + step
+            while cells[index] == player:
+                count += 1
+                index += step
+            index = center - step
+            while cells[index] == player:
+                count += 1
+                index -= step
+            if count >= 5:
+                return True
+        return False
+
+    def _winning_cells(self, player: int) -> List[Tuple[int, int]]:
+        """List the candidate cells where a player would make five."""
+        return [cell for cell in sorted(self.candidates) if self.makes_five(cell[0], cell[1], player)]
+
+    def _four_moves(self, player: int) -> List[Tuple[int, int]]:
+        """List the candidate cells where a player would make a four."""
+        moves = []
+        for row, col in sorted(self.candidates):
+            index = self.index(row, col)
+            self.cells[index] = player  # Only the cells are needed to test the move
+            if self.five_points(row, col, player):
+                moves.append((row, col))
+            self.cells[index] = 0
+        return moves
+
+    def _attack(self, depth: int, blocks: Set[Tuple[int, int]]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Search the attacker's threats (attacker to move).
+
+        Every attacker four is blocked at once, so the attacker never has a
+        five available here; the defender's fives are tracked in blocks.
+
+        Args:
+            depth: Remaining number of attacker threats
+            blocks: Cells where the defender could make five
+
+        Returns:
+            The winning line from this position, or None
+        """
+        self.nodes += 1
+        if depth == 0 or self.nodes >= self.max_nodes:
+            return None
+
+        # A defender four must be blocked, so only the blocking cell can be played
+        blocks = {cell for cell in blocks if self.cells[self.index(*cell)] == 0}
+        # blocks only holds the defender fives made along this path, so it is
+        # part of the key: the hash alone would mix up positions reached with
+        # different cells left to block
+        key = (self.hash, frozenset(blocks))
+        if self.failed.get(key, -1) >= depth:
+            return None
+        if len(blocks) > 1:
+            self.failed[key] = depth
+            return None
+        moves = sorted(blocks) if blocks else sorted(self.candidates)
+
+        # Try fours before threes, since they leave the defender a single reply
+        attacker = self.attacker
+        fours, threes = [], []
+        for row, col in moves:
+            index = self.index(row, col)
+            self.cells[index] = attacker  # Only the cells are needed to test the move
+            points = self.five_points(row, col, attacker)
+            if len(points) > 1:
+                self.cells[index] = 0
+                # Two fives cannot both be blocked: the defender takes one, the attacker the other
+                first, second = sorted(points)[:2]
+                return [(row, col), first, second]
+            if points:
+                fours.append(((row, col), points))
+            elif self.vct:
+                defenses = self.three_defenses(row, col, attacker)
+                if defenses:
+                    threes.append(((row, col), defenses))
+            self.cells[index] = 0
+
+        threes.sort(key=lambda threat: len(threat[1]))
+        threats = [(cell, points, False) for cell, points in fours]
+        threats += [(cell, defenses, True) for cell, defenses in threes]
+        for (row, col), replies, is_three in threats:
+            self._place(row, col, attacker)
+            line = self._defend(replies, depth, blocks, is_three)
+            self._remove(row, col)
+            if line is not None:
+                return [(row, col)] + line
+
+        self.failed[key] = depth
+        return None
+
+    def _defend(self, replies: Set[Tuple[int, int]], depth: int, blocks: Set[Tuple[int, int]],
+                is_three: bool) -> Optional[List[Tuple[int, int]]]:
+        """
+        Try every defender reply to the attacker's last threat.
+
+        Args:
+            replies: Cells that stop the threat
+            depth: Remaining number of attacker threats, this one included
+            blocks: Cells where the defender could make five
+            is_three: True if the threat is an open three rather than a four
+
+        Returns:
+            The winning line after the threat if the attacker wins against all
+            replies, otherwise None
+        """
+        defender = self.defender
+        replies = set(replies)
+        if is_three:
+            # Against a three the defender may also counter with a four
+            replies.update(self._four_moves(defender))
+
+        line = None
+        for row, col in sorted(replies):
+            self._place(row, col, defender)
+            new_blocks = blocks | self.five_points(row, col, defender)
+            sub_line = self._attack(depth - 1, new_blocks)
+            self._remove(row, col)
+            if sub_line is None:
+                return None
+            if line is None:
+                line = [(row, col)] + sub_line
+        return line
+
+
+def solve(board: GomokuBoard, player: Optional[int] = None, vcf_depth: int = 12,
+          vct_depth: int = 4, max_nodes: int = 5000) -> Optional[List[Tuple[int, int]]]:
+    """
+    Search a position for a forced win by continuous fours or threes.
+
+    Args:
+        board: The position to solve (left unchanged)
+        player: Attacking player, who must be the one to move (defaults to
+                board.current_player)
+        vcf_depth: Maximum number of attacker fours in a VCF sequence
+        vct_depth: Maximum number of attacker threats in a VCT sequence (0 disables VCT)
+        max_nodes: Node budget for the search
+
+    Returns:
+        The winning line starting with the attacker's move, or None
+    """
+    return ThreatSolver(vcf_depth, vct_depth, max_nodes).solve(board, player)
@@ -0,0 +1,334 @@
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Tuple, List, Optional
+from player import GomokuAI
+from Controller import GomokuGame
+from records import RecordWriter
+
+COLUMNS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def parse_engine(spec: str) -> dict:
+    """
+    Parse an engine given on the command line as name:algorithm:depth[:time].
+
+    Args:
+        spec: Engine specification, e.g. "ab3:alphabeta:3" or "ab:alphabeta:8:0.5"
+
+    Returns:
+        Engine configuration: its name plus GomokuAI constructor arguments
+    """
+    parts = spec.split(":")
+    if len(parts) not in (3, 4):
+        raise ValueError(f"Engine must be name:algorithm:depth[:time], got {spec!r}")
+    engine = {"name": parts[0], "algorithm": parts[1], "max_depth": int(parts[2])}
+    if len(parts) == 4:
+        engine["time_limit"] = float(parts[3])
+    return engine
+
+
+def random_opening(size: int, plies: int, rng: random.Random, radius: int = 2) -> List[Tuple[int, int]]:
+    """
+    Pick random opening moves near the center of the board.
+
+    Args:
+        size: The size of the board
+        plies: Number of opening moves
+        rng: Random number generator
+        radius: Maximum distance of the opening moves from the center
+
+    Returns:
+        List of distinct (row, col) moves
+    """
+    center = size // 2
+    cells = [(r, c) for r in range(max(0, center - radius), min(size, center + radius + 1))
+             for c in range(max(0, center - radius), min(size, center + radius + 1))]
+    return rng.sample(cells, min(plies, len(cells)))
+
+
+def move_name(row: int, col: int, size: int = 15) -> str:
+    """
+    Get the name of a move in board notation, e.g. (7, 7) -> "h8".
+
+    Boards wider than the alphabet have no column letters, so their moves
+    are named by column and row number instead, e.g. (7, 30) -> "31,8".
+
+    Args:
+        row, col: The move
+        size: The size of the board
+
+    Returns:
+        The move name
+    """
+    if size > len(COLUMNS):
+        return f"{col + 1},{row + 1}"
+    return f"{COLUMNS[col]}{row + 1}"
+
+
+def game_record(moves: List[Tuple[int, int]], result: str, size: int = 15) -> str:
+    """
+    Write a game as a PGN-like move list, e.g. "1. h8 i9 2. g7 1-0".
+
+    Args:
+        moves: Moves of the game in order
+        result: "1-0", "0-1" or "1/2-1/2"
+        size: The size of the board
+
+    Returns:
+        Numbered move list followed by the result
+    """
+    tokens = []
+    for i, (row, col) in enumerate(moves):
+        if i % 2 == 0:
+            tokens.append(f"{i // 2 + 1}.")
+        tokens.append(move_name(row, col, size))
+    tokens.append(result)
+    return " ".join(tokens)
+
+
+def play_game(job: dict) -> dict:
+    """
+    Play one tournament game (run in a worker process).
+
+    Args:
+        job: Game id, black and white engine configurations, opening, board
+             size and move limit
+
+    Returns:
+        The game result as a JSON-serializable record
+    """
+    ais = []
+    for player, engine in ((1, job["black"]), (2, job["white"])):
+        config = {key: value for key, value in engine.items() if key != "name"}
+        ais.append(GomokuAI(player, verbose=False, **config))
+
+    game = GomokuGame(job["size"], gui_enabled=False)
+    start_time = time.time()
+    match = game.play_match(ais[0], ais[1], job["max_moves"], job["opening"])
+    for ai in ais:
+        ai.close()
+
+    result = {1: "1-0", 2: "0-1", None: "1/2-1/2"}[match["winner"]]
+    winner = None
+    if match["winner"]:
+        winner = job["black"]["name"] if match["winner"] == 1 else job["white"]["name"]
+    return {
+        "game": job["game"],
+        "black": job["black"]["name"],
+        "white": job["white"]["name"],
+        "size": job["size"],
+        "opening": job["opening"],
+        "moves": match["moves"],
+        "record": game_record(match["moves"], result, job["size"]),
+        "result": result,
+        "winner": winner,
+        "move_times": match["move_times"],
+        "nodes": match["nodes"],
+        "time": time.time() - start_time,
+    }
+
+
+def make_jobs(engines: List[dict], games: int, size: int, opening_plies: int,
+              max_moves: int, seed: Optional[int]) -> List[dict]:
+    """
+    Schedule a round robin between engines.
+
+    Every pair of engines plays each of its random openings twice, once with
+    each engine as black, so neither side profits from a lopsided opening.
+
+    Args:
+        engines: Engine configurations
+        games: Number of openings per pair of engines
+        size: The size of the board
+        opening_plies: Number of random moves in each opening
+        max_moves: Maximum number of moves per game
+        seed: Seed for the opening generator (None for a random seed)
+
+    Returns:
+        List of game jobs for play_game
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for first, second in itertools.combinations(engines, 2):
+        for _ in range(games):
+            opening = random_opening(size, opening_plies, rng)
+            for black, white in ((first, second), (second, first)):
+                jobs.append({
+                    "game": len(jobs) + 1,
+                    "black": black,
+                    "white": white,
+                    "opening": opening,
+                    "size": size,
+                    "max_moves": max_moves,
+                })
+    return jobs
+
+
+def elo_difference(score: float) -> float:
+    """
+    Convert an expected score to an Elo rating difference.
+
+    Args:
+        score: Expected score between 0 and 1 (a win counts 1, a draw 0.5)
+
+    Returns:
+        Rating difference, infinite for a score of 0 or 1
+    """
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return -400 * math.log10(1 / score - 1)
+
+
+def match_summary(records: List[dict], engine: str, opponent: str) -> dict:
+    """
+    Summarize an engine's results against one opponent.
+
+    The 95% confidence interval comes from the standard error of the
+    per-game score, converted to Elo at both ends.
+
+    Args:
+        records: Game records from play_game
+        engine: Name of the engine to summarize
+        opponent: Name of its opponent
+
+    Returns:
+        Dictionary with wins, draws, losses, score, Elo difference and its
+        95% confidence interval
+    """
+    scores = []
+    for record in records:
+        if {record["black"], record["white"]} != {engine, opponent}:
+            continue
+        if record["winner"] is None:
+            scores.append(0.5)
+        else:
+            scores.append(1.0 if record["winner"] == engine else 0.0)
+
+    n = len(scores)
+    score = sum(scores) / n if n else 0.5
+    variance = sum((s - score) ** 2 for s in scores) / n if n else 0.0
+    margin = 1.96 * math.sqrt(variance / n) if n else 0.0
+    return {
+        "games": n,
+        "wins": scores.count(1.0),
+        "draws": scores.count(0.5),
+        "losses": scores.count(0.0),
+        "score": score,
+        "elo": elo_difference(score),
+        "elo_low": elo_difference(score - margin),
+        "elo_high": elo_difference(score + margin),
+    }
+
+
+def print_summary(records: List[dict], engines: List[dict]):
+    """
+    Print every engine's results against each opponent.
+
+    Args:
+        records: Game records from play_game
+        engines: Engine configurations
+    """
+    print(f"{'Engine':<12} {'Opponent':<12} {'Games':>5} {'W':>4} {'D':>4} {'L':>4} "
+          f"{'Score':>7} {'Elo':>8}  95% CI")
+    for first, second in itertools.permutations([e["name"] for e in engines], 2):
+        s = match_summary(records, first, second)
+        print(f"{first:<12} {second:<12} {s['games']:>5} {s['wins']:>4} {s['draws']:>4} "
+              f"{s['losses']:>4} {s['score']:>7.1%} {s['elo']:>8.1f}  "
+              f"[{s['elo_low']:.1f}, {s['elo_high']:.1f}]")
+
+
+def run_tournament(engines: List[dict], games: int = 10, workers: int = 1, size: int = 15,
+                   opening_plies: int = 2, max_moves: int = 225, output: Optional[str] = None,
+                   seed: Optional[int] = None, records_path: Optional[str] = None) -> List[dict]:
+    """
+    Play a round robin between engines, streaming the game records to a JSONL file.
+
+    Args:
+        engines: Engine configurations (see parse_engine)
+        games: Number of openings per pair of engines (each is played twice)
+        workers: Number of games played at once in separate processes
+        size: The size of the board
+        opening_plies: Number of random moves in each opening
+        max_moves: Maximum number of moves per game
+        output: JSONL file the records are written to as games finish
+        seed: Seed for the opening generator
+        records_path: Binary game record file (see records.py) the games are
+                      also appended to
+
+    Returns:
+        The game records, in the order the games finished
+    """
+    names = [engine["name"] for engine in engines]
+    if len(set(names)) != len(names):
+        raise ValueError("Engine names must be unique")
+
+    jobs = make_jobs(engines, games, size, opening_plies, max_moves, seed)
+    records = []
+    output_file = open(output, "a") if output else None
+    record_writer = RecordWriter(records_path) if records_path else None
+
+    def finish(record: dict):
+        records.append(record)
+        if output_file:
+            output_file.write(json.dumps(record) + "\n")
+            output_file.flush()  # Keep finished games even if the run is interrupted
+        if record_writer:
+            record_writer.write(record)
+            record_writer.flush()
+        print(f"Game {record['game']}/{len(jobs)}: {record['black']} vs {record['white']} "
+              f"{record['result']} in {len(record['moves'])} moves")
+
+    try:
+        if workers <= 1:
+            for job in jobs:
+                finish(play_game(job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(play_game, job) for job in jobs]
+                for future in as_completed(futures):
+                    finish(future.result())
+    finally:
+        if output_file:
+            output_file.close()
+        if record_writer:
+            record_writer.close()
+
+    return records
+
+
+def main():
+    """Run a tournament from the command line."""
+    parser = argparse.ArgumentParser(description="Play a Gomoku engine tournament.")
+    parser.add_argument("--engine", action="append", required=True,
+                        help="Engine as name:algorithm:depth[:time] (give at least two)")
+    parser.add_argument("--games", type=int, default=10,
+                        help="Openings per pair of engines, each played with both colours")
+    parser.add_argument("--workers", type=int, default=1, help="Games played in parallel")
+    parser.add_argument("--size", type=int, default=15, help="Board size")
+    parser.add_argument("--opening-plies", type=int, default=2,
+                        help="Random moves played near the center before the engines start")
+    parser.add_argument("--max-moves", type=int, default=225,
+                        help="Moves after which a game is a draw")
+    parser.add_argument("--output", help="JSONL file the game records are appended to")
+    parser.add_argument("--seed", type=int, help="Seed for the random openings")
+    parser.add_argument("--records", help="Binary game record file the games are appended to")
+    args = parser.parse_args()
+
+    engines = [parse_engine(spec) for spec in args.engine]
+    if len(engines) < 2:
+        parser.error("At least two engines are needed")
+
+    records = run_tournament(engines, args.games, args.workers, args.size, args.opening_plies,
+                             args.max_moves, args.output, args.seed, args.records)
+    print_summary(records, engines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from typing import Tuple, Optional
+
+# Bound types stored with each entry
+EXACT = 0        # Score is the exact minimax value
+LOWER_BOUND = 1  # Search failed high, true value is >= score
+UPPER_BOUND = 2  # Search failed low, true value is <= score
+
+
+class TTEntry:
+    """A single transposition table slot."""
+
+    __slots__ = ("key", "depth", "score", "flag", "best_move", "generation")
+
+    def __init__(self, key: int, depth: int, score: float, flag: int,
+                 best_move: Optional[Tuple[int, int]], generation: int = 0):
+        self.key = key
+        self.depth = depth
+        self.score = score
+        self.flag = flag
+        self.best_move = best_move
+        self.generation = generation  # Search that stored the entry
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by Zobrist hash.
+
+    A table kept across moves counts its searches in generations. Entries
+    from earlier searches are replaced regardless of depth and can be
+    evicted once they are old, since the game has usually moved past them.
+    """
+
+    REPLACEMENT_POLICIES = ("always", "depth")
+
+    def __init__(self, size: int = 1 << 18, replacement: str = "depth"):
+        """
+        Initialize the transposition table.
+
+        Args:
+            size: Number of slots in the table
+            replacement: "always" to overwrite on every store, or "depth" to keep
+                         an entry for a different position if it was searched deeper
+        """
+        if size <= 0:
+            raise ValueError("Transposition table size must be positive")
+        if replacement not in self.REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+
+        self.size = size
+        self.replacement = replacement
+        self.slots = [None] * size
+        self.generation = 0  # Number of searches since the table was cleared
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        """
+        Look up the entry stored for a position.
+
+        Args:
+            key: Zobrist hash of the position
+
+        Returns:
+            The stored entry, or None if the position is not in the table
+        """
+        entry = self.slots[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.key != key:
+            # Slot is taken by another position
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, score: float, flag: int,
+              best_move: Optional[Tuple[int, int]]):
+        """
+        Store a search result, subject to the replacement policy.
+
+        Args:
+            key: Zobrist hash of the position
+            depth: Remaining depth the position was searched to
+            score: Score found by the search
+            flag: EXACT, LOWER_BOUND or UPPER_BOUND
+            best_move: Best move found in the position, if any
+        """
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None:
+            self.slots[index] = TTEntry(key, depth, score, flag, best_move, self.generation)
+            return
+
+        if (self.replacement == "depth" and entry.key != key
+                and entry.depth > depth and entry.generation == self.generation):
+            return  # Keep the deeper result for the other position
+
+        # Reuse the slot object instead of allocating a new one
+        entry.key = key
+        entry.depth = depth
+        entry.score = score
+        entry.flag = flag
+        entry.best_move = best_move
+        entry.generation = self.generation
+
+    def new_search(self, max_age: int):
+        """
+        Start a new generation, keeping the entries of recent searches.
+
+        Args:
+            max_age: Number of generations an entry is kept without being stored again
+        """
+        self.generation += 1
+        oldest = self.generation - max_age
+        slots = self.slots
+        for index, entry in enumerate(slots):
+            if entry is not None and entry.generation < oldest:
+                slots[index] = None
+        self.reset_stats()
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        self.slots = [None] * self.size
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the hit/miss/collision counters."""
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0